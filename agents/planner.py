@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import math
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+# Agents ship in agents/ but are also dropped next to engine.py
+if not os.path.exists(os.path.join(GAME_DIR, "engine.py")): GAME_DIR = os.path.dirname(GAME_DIR)
+sys.path.insert(0, GAME_DIR)
+from runtime import Policy
+from engine import room_name
+
+# Value of a banked unit at the end of a path, in XP
+KEY_VALUE = 50 # what --sell-key pays
+STAT_VALUE = {"atk": 20, "max_hp": 2, "dr": 15, "dodge": 5, "crit": 3}
+DEATH = -1e9
+
+class Planner:
+    # Beam search over the rooms behind each door. Every sector is a pure function of (seed, path, params),
+    # so future rooms are built with engine.build_contents and their fight/loot facts memoized per sector.
+    def __init__(self, horizon=4, beam=12, budget=0.05, memo_size=20000):
+        self.horizon = horizon; self.beam = beam; self.budget = budget; self.memo_size = memo_size
+        self.memo = {}; self.hits = 0; self.misses = 0
+
+    def room(self, engine, path, door_type, depth):
+        p = engine.player
+        key = (engine.seed, path, door_type, depth, p['corruption'])
+        facts = self.memo.get(key)
+        if facts is not None: self.hits += 1; return facts
+        self.misses += 1
+        spec = engine.build_contents(path, {"seed": engine.seed, "door_type": door_type, "backtrack": False, "depth": depth,
+                                            "corruption": p['corruption'], "leaks": 0})
+        mobs = [(m['hp'], m['atk'], m['xp'], tuple(m.get('traits', ()))) for _, m in sorted(spec['mobs'].items())]
+        items = [it for _, it in sorted(spec['items'].items())]
+        doors = [(f_n, d['leads_to'], d['locked'], room_name(path, f_n)) for f_n, d in sorted(spec['doors'].items())]
+        if len(self.memo) >= self.memo_size: self.memo.clear()
+        facts = self.memo[key] = (mobs, items, doors)
+        return facts
+
+    def step(self, s, facts):
+        # Expected outcome of clearing one sector from state s (dict of player stats); returns the new state
+        mobs, items, _ = facts
+        s = dict(s)
+        for hp, atk, xp, traits in mobs:
+            hit_rate = s['atk'] * (1 + s['crit'] / 100.0)
+            turns = math.ceil(hp / max(1.0, hit_rate))
+            tracking = 40 if "unavoidable" in traits else 15 if "true_dmg" in traits else 0
+            dodge = max(0, s['dodge'] - tracking) / 100.0
+            dr = s['dr'] * (0.25 if "true_dmg" in traits else 1.0)
+            dmg = max(1, atk - dr) * (1.25 if "crit" in traits else 1.0)
+            s['hp'] -= (turns - 1) * ((1 - dodge) * dmg + dodge * max(1, atk // 10))
+            if s['hp'] <= 0: s['dead'] = True; return s
+            s['xp'] += xp
+        for it in items:
+            if it['type'] == "key": s['keys'] += 1
+            elif it['type'] == "heal": s['hp'] = min(s['max_hp'], s['hp'] + it['value'])
+            elif it['type'] == "buff":
+                stat = it['stat']
+                if stat in s: s[stat] += it['value']
+                if stat == "max_hp": s['hp'] += it['value']
+                if 'dr' in it: s['dr'] += it['dr']
+                if 'dodge' in it: s['dodge'] = max(0, min(75, s['dodge'] + it['dodge']))
+                if 'atk' in it and stat != "atk": s['atk'] += it['atk']
+        return s
+
+    def score(self, s, start):
+        if s.get('dead'): return DEATH + s['depth']
+        v = s['xp'] - start['xp'] + KEY_VALUE * (s['keys'] - start['keys']) + 2 * (s['hp'] - start['hp'])
+        return v + sum(w * (s[k] - start[k]) for k, w in STAT_VALUE.items())
+
+    def plan(self, engine):
+        # Best door out of the current sector: {"door", "score", "route", "expanded"} (door None if no way on)
+        p = engine.player; w = engine.world; room = p['room_path']
+        start = {k: p[k] for k in ("hp", "max_hp", "atk", "dr", "dodge", "crit", "xp", "keys", "depth")}
+        beam = []
+        for f_n in w.list(room, "doors"):
+            d = w.read(room, "doors", f_n)
+            beam.append((0.0, [f_n], start, room_name(room, f_n), d['leads_to'], d['locked']))
+        if not beam: return {"door": None, "score": None, "route": [], "expanded": 0}
+        deadline = time.perf_counter() + self.budget; expanded = 0; best = None
+        for _ in range(self.horizon):
+            nxt = []; level_best = None
+            for _, route, s, path, door_type, locked in beam:
+                s = dict(s, depth=s['depth'] + 1)
+                if locked:
+                    if s['keys'] <= 0: continue
+                    s['keys'] -= 1
+                facts = self.room(engine, path, door_type, s['depth']); expanded += 1
+                s = self.step(s, facts); v = self.score(s, start)
+                if level_best is None or v > level_best[0]: level_best = (v, route)
+                if not s.get('dead') and s['depth'] < 100:
+                    for f_n, leads_to, d_locked, child in facts[2]: nxt.append((v, route + [f_n], s, child, leads_to, d_locked))
+                if time.perf_counter() > deadline: break
+            # Deeper levels win: the route is picked from the last level that was expanded
+            if level_best: best = level_best
+            if not nxt or time.perf_counter() > deadline: break
+            nxt.sort(key=lambda b: b[0], reverse=True); beam = nxt[:self.beam]
+        if best is None: best = (None, beam[0][1]) # Every door locked and no keys
+        return {"door": best[1][0], "score": best[0], "route": best[1], "expanded": expanded}
+
+    def best_door(self, engine):
+        return self.plan(engine)['door']
+
+class PlannerPolicy(Policy):
+    # SysAdmin play with lookahead door choice: python3 agents/runtime.py --policy planner
+    def __init__(self, planner=None):
+        self.planner = planner or Planner()
+
+    def door(self, p, doors):
+        return self.planner.best_door(self.engine) or doors[0]
+
+if __name__ == "__main__":
+    # Planner doors vs. fixed ROOT preference on the same seeds, headless
+    import argparse
+    sys.path.insert(0, os.path.join(GAME_DIR, "tools"))
+    from headless_sim import simulate, DEFAULT_GLOBALS
+    from sysadmin_ascender import SysAdminPolicy
+    ap = argparse.ArgumentParser(description="Compare planner door choice with the fixed preference")
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--seed", default="plan")
+    ap.add_argument("--horizon", type=int, default=4)
+    ap.add_argument("--beam", type=int, default=12)
+    args = ap.parse_args()
+
+    planner = Planner(args.horizon, args.beam)
+    for name, make in (("root-pref", SysAdminPolicy), ("planner", lambda: PlannerPolicy(planner))):
+        start = time.time()
+        res = [simulate(make(), f"{args.seed}-{i}", DEFAULT_GLOBALS) for i in range(args.runs)]
+        print(f"[{name}] mean depth {sum(r['depth'] for r in res) / len(res):.1f} | max {max(r['depth'] for r in res)} | "
+              f"mean XP {sum(r['xp_banked'] for r in res) / len(res):.0f} | {time.time() - start:.2f}s")
+    print(f">> planner memo {planner.hits} hits / {planner.misses} misses")
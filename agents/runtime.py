@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import importlib
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = AGENT_DIR
+# Agents ship in agents/ but are also dropped next to engine.py
+if not os.path.exists(os.path.join(GAME_DIR, "engine.py")): GAME_DIR = os.path.dirname(GAME_DIR)
+sys.path.insert(0, GAME_DIR)
+sys.path.insert(0, AGENT_DIR)
+from engine import DelveEngine, Colors, pop_flag
+
+class Policy:
+    # Decisions only; AgentRuntime drives the engine. Defaults are the SysAdmin behaviour,
+    # so a strategy overrides just the hooks it changes.
+    banner = "Initializing Ascent..."
+    defrag_at = 100        # fragmentation that triggers --defrag
+    heal_until_safe = True # keep patching until above the threshold (False: one heal per sector)
+
+    def status(self, p):
+        return f"{Colors.BOLD}{Colors.CYAN}[DEPTH {p['depth']}]{Colors.END} Current Sector: {p['room_path']} | HP: {p['hp']}/{p['max_hp']} | Keys: {p['keys']}"
+
+    def use(self, p, item):
+        # Buffs and keys to consume right away
+        return item['type'] in ("buff", "key")
+
+    def heal_threshold(self, p):
+        return 0.9 if p['depth'] >= 80 else 0.7
+
+    def opcode(self, p, c, turn):
+        # One combat turn: MOV/NOP/ADD/XOR/LOCK, or PURGE / OVERCLOCK for the skills
+        if "Key Devourer" in c['mob_name']:
+            if c.get('lock_turns', 0) <= 1 and p['keys'] > 0: return "LOCK"
+            if c['mob_hp'] < c['mob_max_hp'] * 0.25: return "PURGE"
+        return "MOV"
+
+    def on_event(self, event):
+        # Engine events as they happen (combat_start, turn, purged, level_up, room, terminated, ...)
+        pass
+
+    def door(self, p, doors):
+        for d in doors:
+            if "root" in d.lower(): return d
+        return doors[0]
+
+class AgentRuntime:
+    # One in-process engine session for a whole ascent: loot, use items, fight, defrag, pick a door, repeat.
+    # steps() is the ascent as a stream of commands; run() executes it here, tools/headless_sim.Descent drives
+    # the same stream for headless batches (orchestrator, run farm, bench).
+    def __init__(self, policy, root=None, engine=None, verbose=True):
+        self.engine = engine or DelveEngine(verbose=False, root=root)
+        self.policy = policy; policy.engine = self.engine # For policies that look at the world (e.g. the planner)
+        self.verbose = verbose
+        self.engine.on(policy.on_event)
+        self.outcome = None; self.depth = 0
+        self.engine.on(self.track)
+
+    def track(self, event):
+        # The run's result comes from engine events, not from scraping the printed log
+        if event.get('depth') is not None: self.depth = max(self.depth, event['depth'])
+        if event['event'] in ("terminated", "conquered"): self.outcome = event['event']
+
+    def note(self, msg):
+        if self.verbose: print(msg)
+
+    def run_engine(self, *args, policy=None):
+        res = self.engine.execute(list(args), policy=policy)
+        self.flush()
+        return res
+
+    def flush(self):
+        out = "\n".join(self.engine.lines).strip(); self.engine.lines = []
+        if out: self.note(out)
+        return out
+
+    def player(self):
+        return self.engine.player if 'depth' in self.engine.player else None
+
+    def steps(self):
+        # Yields (argv, fight policy or None) for the caller to execute, reading engine state in between.
+        # Each fight is one --fight under the policy's opcode choice, so the action log, metrics and listeners
+        # see it like any other command. Ends when the run ends or there is nowhere left to go.
+        while True:
+            p = self.player()
+            if not p:
+                self.note(f"{Colors.RED}Player state lost. Termination detected.{Colors.END}")
+                return
+            self.note(f"\n{self.policy.status(p)}")
+            room = p['room_path']
+            for item_f in self.engine.world.list(room, "items"):
+                self.note(f"{Colors.GREEN}Looting {item_f}...{Colors.END}")
+                yield ["--loot", item_f], None
+            p = self.player()
+            if not p: return
+            for item in list(p['inventory']):
+                if self.policy.use(p, item):
+                    self.note(f"{Colors.YELLOW}Using {item['name']}{Colors.END}")
+                    yield ["--use", item['name']], None
+            p = self.player()
+            if not p: return
+            threshold = self.policy.heal_threshold(p)
+            for item in list(p['inventory']):
+                if p['hp'] >= p['max_hp'] * threshold: break
+                if item['type'] == "heal":
+                    self.note(f"{Colors.GREEN}HP LOW ({p['hp']}/{p['max_hp']}). Healing with {item['name']}...{Colors.END}")
+                    yield ["--use", item['name']], None
+                    if not self.policy.heal_until_safe: break
+            for mob_f in self.engine.world.list(room, "mobs"):
+                if not self.player(): return
+                self.note(f"{Colors.RED}Engaging {mob_f}...{Colors.END}")
+                yield ["--fight", mob_f], self.policy.opcode
+            p = self.player()
+            if not p: return
+            if p['depth'] >= 100:
+                self.note(f"{Colors.BOLD}{Colors.PURPLE}REACHED DEPTH 100. FINAL BOSS SHOULD BE PURGED.{Colors.END}")
+                return
+            if p['fragmentation'] > self.policy.defrag_at: yield ["--defrag"], None
+            doors = self.engine.world.list(room, "doors")
+            if not doors:
+                self.note(f"{Colors.RED}No doors found! Dead end?{Colors.END}")
+                return
+            target = self.policy.door(p, doors)
+            self.note(f"Entering door: {Colors.BOLD}{target}{Colors.END}")
+            yield ["--enter", target], None
+            if self.player() and self.player()['room_path'] == room: return # Locked with no keys left: nowhere to go
+
+    def run(self):
+        # Returns {"depth", "conquered", "outcome", "xp_banked"}; outcome is None if the agent stopped with the run still live
+        self.note(f"{Colors.BOLD}{Colors.PURPLE}{self.policy.banner}{Colors.END}")
+        self.run_engine("--init"); xp_before = self.engine.globals['total_xp']
+        for argv, fight in self.steps(): self.run_engine(*argv, policy=fight)
+        return {"depth": self.depth, "conquered": self.outcome == "conquered", "outcome": self.outcome,
+                "xp_banked": self.engine.globals['total_xp'] - xp_before}
+
+POLICIES = {"sysadmin": ("sysadmin_ascender", "SysAdminPolicy"), "ghost": ("ghost_ascender", "GhostPolicy"),
+            "netrunner": ("netrunner_ascender", "NetrunnerPolicy"), "planner": ("planner", "PlannerPolicy")}
+
+def load_policy(name):
+    # A strategy by its POLICIES name (picklable, so process pools ship names, not instances)
+    module, cls = POLICIES[name]
+    return getattr(importlib.import_module(module), cls)()
+
+def main(policy=None):
+    # python3 agents/runtime.py --policy ghost [--root <dir>] [--json]; the ascenders call main(TheirPolicy()).
+    # --json ends the output with the run result as one JSON line (tools/evolution_runner.py reads it)
+    root, argv = pop_flag(sys.argv[1:], "--root")
+    if policy is None:
+        name, argv = pop_flag(argv, "--policy")
+        policy = load_policy(name or "sysadmin")
+    result = AgentRuntime(policy, root=root).run()
+    if "--json" in argv: print(json.dumps(result, separators=(",", ":")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+ENGINE = os.path.join(ROOT, "engine.py")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+from engine import DelveEngine, MemoryWorld, ROOM_CACHE, MOBS, SPECIAL_MOBS, ITEMS
+from headless_sim import DEFAULT_GLOBALS, simulate
+from runtime import AgentRuntime, load_policy
+
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# Strong enough that the greedy policy reaches depth 100 on every bench seed
+DESCENT_GLOBALS = dict(DEFAULT_GLOBALS, base_hp=3000, base_atk=120, base_crit=30, base_dodge=40)
+
+def engine_at(depth=0, root=None, world=None):
+    # Seeded run at the given depth: in memory, or on real files under root
+    g = dict(DESCENT_GLOBALS)
+    if root: eng = DelveEngine(verbose=False, root=root, world=world, globals=g)
+    else: eng = DelveEngine(verbose=False, world=MemoryWorld(), persist=False, globals=g)
+    eng.reset_run("bench"); eng.player['depth'] = depth
+    return eng
+
+def bench_generate_room(n):
+    # Fresh sector paths: every call is a cache miss, i.e. a full build + place
+    eng = engine_at()
+    start = time.perf_counter()
+    for i in range(n):
+        eng.player['depth'] = i % 100
+        eng.generate_room(f"room_b{i:06x}")
+    return {"ops": n, "seconds": time.perf_counter() - start}
+
+def bench_get_scaled_mob(n):
+    eng = engine_at(); rng = eng.roll("combat"); ids = list(MOBS) + list(SPECIAL_MOBS)
+    start = time.perf_counter()
+    for i in range(n): eng.get_scaled_mob(ids[i % len(ids)], rng, is_ghost=i % 7 == 0, depth=i % 100, corruption=i % 50)
+    return {"ops": n, "seconds": time.perf_counter() - start}
+
+def bench_combat_turn(n):
+    # One endless fight at depth 30: both sides are made unkillable so every call is a regular turn
+    eng = engine_at(depth=30); eng.generate_room("start")
+    eng.player['hp'] = eng.player['max_hp'] = 10 ** 9
+    eng.attack_init(eng.world.list("start", "mobs")[0])
+    eng.combat['mob_hp'] = eng.combat['mob_max_hp'] = 10 ** 9
+    ops = ("MOV", "MOV", "ADD", "XOR", "MOV", "NOP")
+    start = time.perf_counter()
+    for i in range(n):
+        eng.lines = []; eng.events = []
+        eng.combat_turn(ops[i % len(ops)])
+    return {"ops": n, "seconds": time.perf_counter() - start}
+
+def bench_loot_use(n):
+    # --loot then --use of a patch dropped back on the floor each time; counts both calls
+    eng = engine_at(); eng.generate_room("start")
+    floor = eng.world.rooms["start"]["items"]; patch = ITEMS[0x20]
+    start = time.perf_counter()
+    for _ in range(n):
+        floor["Cache_Patch.json"] = patch; eng.player['fragmentation'] = 0
+        eng.loot("Cache_Patch.json"); eng.use_item("Cache_Patch")
+    return {"ops": 2 * n, "seconds": time.perf_counter() - start}
+
+def bench_wipe_traces(n, world="files", rooms=100):
+    # Teardown of a run that went `rooms` sectors deep on real directories; only the wipe is timed
+    elapsed = 0.0
+    with tempfile.TemporaryDirectory(prefix="labyrinth_bench_") as root:
+        os.makedirs(os.path.join(root, "start"))
+        for _ in range(n):
+            eng = engine_at(root=root, world=world); eng.generate_room("start")
+            for i in range(rooms): eng.player['depth'] = i; eng.generate_room(f"room_w{i:04x}")
+            start = time.perf_counter(); eng.wipe_traces(); elapsed += time.perf_counter() - start
+    return {"ops": n, "seconds": elapsed}
+
+def bench_descent(n, root=False):
+    # Full seeded SysAdmin descents to depth 100 in-process, in memory or on real files
+    actions = 0; depths = []; start = time.perf_counter()
+    for i in range(n):
+        if root:
+            with tempfile.TemporaryDirectory(prefix="labyrinth_bench_") as tmp:
+                os.makedirs(os.path.join(tmp, "start"))
+                r = simulate(load_policy("sysadmin"), f"bench-{i}", DESCENT_GLOBALS, root=tmp)
+        else: r = simulate(load_policy("sysadmin"), f"bench-{i}", DESCENT_GLOBALS)
+        actions += r['actions']; depths.append(r['depth'])
+    return {"ops": actions, "seconds": time.perf_counter() - start, "depth": depths}
+
+def bench_descent_cli(n, max_actions=2000):
+    # The path the subprocess agents take: one `engine.py ... --json` process per action. The runtime's steps are
+    # played over the CLI, a fight as --attack plus one --op per turn, and state is read back through a fresh
+    # engine after every call like an agent would. Only the subprocess calls are timed.
+    env = dict(os.environ, LABYRINTH_NO_DAEMON="1")
+    skills = {"PURGE": ["--purge-cmd"], "OVERCLOCK": ["--overclock"]}
+    actions = 0; depths = []; elapsed = 0.0
+    for i in range(n):
+        with tempfile.TemporaryDirectory(prefix="labyrinth_bench_") as root:
+            os.makedirs(os.path.join(root, "start"))
+            with open(os.path.join(root, "global_stats.json"), "w") as f: json.dump(DESCENT_GLOBALS, f)
+            def call(argv):
+                nonlocal elapsed, steps
+                t0 = time.perf_counter()
+                subprocess.run([sys.executable, ENGINE, "--root", root, *argv, "--json"], capture_output=True, text=True, env=env)
+                elapsed += time.perf_counter() - t0; steps += 1
+                runtime.engine = runtime.policy.engine = eng = DelveEngine(verbose=False, root=root)
+                return eng
+            steps = 0; runtime = AgentRuntime(load_policy("sysadmin"), engine=DelveEngine(verbose=False, root=root), verbose=False)
+            eng = call(["--init", "--seed", f"bench-{i}"]); depth = 0
+            for argv, fight in runtime.steps():
+                if steps >= max_actions: break
+                if fight is None: eng = call(argv)
+                else:
+                    eng = call(["--attack", argv[1]]); turn = 0
+                    while eng.combat and 'depth' in eng.player and steps < max_actions:
+                        op = fight(eng.player, eng.combat, turn); turn += 1
+                        eng = call(skills.get(op, ["--op", op]))
+                depth = max(depth, eng.player.get('depth', 0))
+            actions += steps; depths.append(depth)
+    return {"ops": actions, "seconds": elapsed, "depth": depths}
+
+# name -> (function, default size); sizes are multiplied by --scale
+BENCHMARKS = {
+    "generate_room": (bench_generate_room, 2000),
+    "get_scaled_mob": (bench_get_scaled_mob, 50000),
+    "combat_turn": (bench_combat_turn, 10000),
+    "loot_use_item": (bench_loot_use, 5000),
+    "wipe_traces": (bench_wipe_traces, 10),
+    "wipe_traces_scratch": (lambda n: bench_wipe_traces(n, "scratch"), 10),
+    "descent_memory": (lambda n: bench_descent(n), 100),
+    "descent_files": (lambda n: bench_descent(n, root=True), 3),
+    "descent_cli": (bench_descent_cli, 1),
+}
+
+def run(names, scale=1.0, repeat=3):
+    # Best of `repeat` for each benchmark; descents are deterministic, so only their timing varies
+    results = {}
+    for name in names:
+        fn, size = BENCHMARKS[name]
+        n = max(1, int(size * scale)); best = None
+        for _ in range(1 if name == "descent_cli" else repeat):
+            ROOM_CACHE.specs.clear() # Every repeat starts cold
+            r = fn(n)
+            if best is None or r['seconds'] < best['seconds']: best = r
+        best['ops_per_sec'] = best['ops'] / best['seconds']; best['us_per_op'] = best['seconds'] / best['ops'] * 1e6
+        results[name] = best
+        print(f"{name:20} {best['ops_per_sec']:12.0f} ops/s {best['us_per_op']:11.1f} us/op", flush=True)
+    return results
+
+def compare(results, baseline, threshold):
+    # Regressions: benchmarks more than `threshold` (fraction) slower than the baseline.
+    # A descent reaching different depths means the engine's behaviour changed, not just its speed.
+    regressions = []
+    print(f">> vs baseline ({baseline['meta'].get('commit') or 'unknown commit'}, threshold {threshold:.0%})")
+    for name, r in results.items():
+        base = baseline['results'].get(name)
+        if not base: continue
+        r['vs_baseline'] = ratio = r['ops_per_sec'] / base['ops_per_sec']
+        flag = "REGRESSION" if ratio < 1 - threshold else "faster" if ratio > 1 + threshold else "ok"
+        if flag == "REGRESSION": regressions.append(name)
+        # Seeds are bench-0, bench-1, ... so runs at different --scale still share a prefix
+        k = min(len(base.get('depth', [])), len(r.get('depth', [])))
+        note = " | depths differ from baseline" if k and base['depth'][:k] != r['depth'][:k] else ""
+        print(f"{name:20} x{ratio:6.2f}  {flag}{note}")
+    return regressions
+
+def meta():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError: commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(), "time": time.time()}
+
+def main():
+    ap = argparse.ArgumentParser(description="Engine hot-path benchmarks, compared against a stored baseline")
+    ap.add_argument("--only", action="append", choices=list(BENCHMARKS), help="Repeatable; default: all")
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every benchmark's size (e.g. 0.1 for a smoke run)")
+    ap.add_argument("--repeat", type=int, default=3, help="Best of N runs per benchmark")
+    ap.add_argument("--out", help="Write results JSON here")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline before failing (fraction)")
+    ap.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = ap.parse_args()
+
+    results = run(args.only or list(BENCHMARKS), args.scale, args.repeat)
+    doc = {"meta": dict(meta(), scale=args.scale), "results": results}
+    regressions = []
+    if args.update_baseline:
+        # Merge so a partial (--only) run refreshes just its own entries
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f: old = json.load(f)
+            doc['results'] = dict(old['results'], **results)
+        with open(args.baseline, "w") as f: json.dump(doc, f, indent=2)
+        print(f">> Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f: regressions = compare(results, json.load(f), args.threshold)
+    else: print(f">> No baseline at {args.baseline}; run with --update-baseline to record one")
+    if args.out:
+        with open(args.out, "w") as f: json.dump({"meta": doc['meta'], "results": results, "regressions": regressions}, f, indent=2)
+    if regressions:
+        print(f">> {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
+import time
+# Taken before the other imports on purpose: --timing's import phase includes them (json, threading, ...)
+IMPORT_START = time.perf_counter()
 import os
 import sys
-import random
 import json
-import hashlib
-import time
-import copy
+import threading
+from collections import OrderedDict, namedtuple, deque
 
 # Colors
 class Colors:
@@ -17,14 +18,70 @@ class Colors:
     END = '\033[0m'
 
 # Configuration
+# GAME_DIR is where the engine lives; the game root (state files + sectors) defaults to it
+# but can be moved with DelveEngine(root=...), --root <dir> or LABYRINTH_ROOT.
 GAME_DIR = os.path.dirname(os.path.abspath(__file__))
-PLAYER_FILE = os.path.join(GAME_DIR, "player_stats.json")
-GLOBAL_FILE = os.path.join(GAME_DIR, "global_stats.json")
-LOG_FILE = os.path.join(GAME_DIR, "session_log.json")
-BOSS_FILE = os.path.join(GAME_DIR, "boss_state.json")
-COMBAT_FILE = os.path.join(GAME_DIR, "combat_state.json")
 WORLD_SEED = "GEMINI_V1"
 
+def game_root(root=None):
+    return os.path.abspath(root or os.environ.get("LABYRINTH_ROOT") or GAME_DIR)
+
+def socket_path(root=None):
+    # An explicit root always gets its own socket; LABYRINTH_SOCKET only moves the default root's
+    if root: return os.path.join(game_root(root), "engine.sock")
+    return os.environ.get("LABYRINTH_SOCKET") or os.path.join(game_root(), "engine.sock")
+
+# Durability: "none" (rename only), "checkpoint" (fsync globals, room changes, compactions), "always"
+FSYNC_MODES = ("none", "checkpoint", "always")
+
+def fsync_mode(mode=None):
+    return mode or os.environ.get("LABYRINTH_FSYNC") or "checkpoint"
+
+def should_sync(mode, checkpoint):
+    return mode == "always" or (mode == "checkpoint" and checkpoint)
+
+def fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try: os.fsync(fd)
+    finally: os.close(fd)
+
+# Process-wide I/O counters. save_seconds is the wall time spent persisting state (write_json, journal appends,
+# action log), reported by --timing as the save phase; --metrics records per-command deltas of the rest.
+IO_STATS = {"save_seconds": 0.0, "writes": 0, "opens": 0, "bytes_written": 0, "dirs_created": 0}
+
+def count_write(t0, nbytes, opened=True):
+    IO_STATS['save_seconds'] += time.perf_counter() - t0; IO_STATS['writes'] += 1
+    IO_STATS['opens'] += opened; IO_STATS['bytes_written'] += nbytes
+
+def make_dirs(path):
+    # os.makedirs(exist_ok=True) that counts what it creates
+    if os.path.isdir(path): return
+    os.makedirs(path, exist_ok=True); IO_STATS['dirs_created'] += 1
+
+def write_json(path, data, checkpoint=False, mode=None, indent=4):
+    # Temp file + rename: a crash or a killed agent never leaves a truncated document behind
+    t0 = time.perf_counter()
+    sync = should_sync(fsync_mode(mode), checkpoint)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+        if sync: f.flush(); os.fsync(f.fileno())
+        nbytes = f.tell()
+    os.replace(tmp, path)
+    if sync: fsync_dir(os.path.dirname(path))
+    count_write(t0, nbytes)
+
+def room_name(room, door_f):
+    # The room graph: the sector behind door_f of room. Depends on the route only, never on the seed
+    import hashlib
+    return f"room_{hashlib.md5((room + door_f).encode()).hexdigest()[:6]}"
+
+def pop_flag(argv, flag):
+    # Pull "<flag> <value>" out of argv wherever it appears; returns (value or None, remaining argv)
+    if flag not in argv: return None, list(argv)
+    i = argv.index(flag)
+    return (argv[i + 1] if i + 1 < len(argv) else None), list(argv[:i]) + list(argv[i + 2:])
+
 # Content Mapping
 MOBS = {
     0x01: {"name": "Minor Bug", "hp": 10, "atk": 2, "xp": 10},
@@ -70,37 +127,531 @@ RARITIES = {
     "LEGENDARY": {"chance": 0.02, "stat_mult": 5.0, "xp_mult": 20, "color": f"{Colors.PURPLE}{Colors.BOLD}[LEGENDARY]{Colors.END} "},
 }
 
+# Mob scaling index: everything get_scaled_mob derives from (mob, depth // 5, rarity, ghost) is computed once.
+# k keeps the d_mult * stat_mult product so spawn-time float math runs in the original order.
+MobScale = namedtuple("MobScale", "name hp atk xp traits k g")
+
+def mob_scale(mob_id, bucket, rarity_name, is_ghost):
+    mob = MOBS.get(mob_id) or SPECIAL_MOBS[mob_id]; rarity = RARITIES[rarity_name]
+    d_mult = 1.0 + bucket * 0.1
+    if mob_id in SPECIAL_MOBS and mob_id >= 0x10: d_mult = min(1.3, d_mult)
+    if bucket >= 4: d_mult += 0.2  # depth >= 20
+    if bucket >= 10: d_mult += 0.5 # depth >= 50
+    name = ("[GHOST] " if is_ghost else "") + rarity['color'] + mob['name']
+    traits = tuple(mob['traits']) if 'traits' in mob else None
+    return MobScale(name, mob['hp'], mob['atk'], int(mob['xp'] * d_mult * rarity['xp_mult']), traits,
+                    d_mult * rarity['stat_mult'], 1.2 if is_ghost else 1.0)
+
+MOB_SCALES = {} # Filled on demand by get_scaled_mob: a CLI process only pays for the mobs it actually spawns
+
+ROOM_KINDS = ("mobs", "items", "doors")
+
+class RoomCache:
+    # Bounded LRU of built sector contents. build_contents is a pure function of (path, params), so a hit skips the
+    # sha256, the RNG draws and the mob deepcopies. Specs are shared: worlds copy on store/read, never mutate.
+    # Locked, since engines on several threads share it (orchestrator --executor thread, the daemon); the build
+    # itself runs unlocked, so two threads may build the same pure spec once each.
+    def __init__(self, size=256):
+        self.size = size; self.specs = OrderedDict(); self.hits = 0; self.misses = 0; self.lock = threading.Lock()
+
+    def get(self, path, params, build):
+        key = (path,) + tuple(sorted(params.items()))
+        with self.lock:
+            spec = self.specs.get(key)
+            if spec is not None:
+                self.hits += 1; self.specs.move_to_end(key)
+                return spec
+            self.misses += 1
+        spec = build(path, params)
+        if self.size > 0:
+            with self.lock:
+                self.specs[key] = spec
+                if len(self.specs) > self.size: self.specs.popitem(last=False)
+        return spec
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": self.size, "entries": len(self.specs), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+# One cache per process, shared by every engine in it (size: LABYRINTH_ROOM_CACHE, 0 disables)
+ROOM_CACHE = RoomCache(int(os.environ.get("LABYRINTH_ROOM_CACHE", 256)))
+ROOM_INFO_PARAMS = ("lvl", "class") # Sector params that change room_info.txt but never the contents
+
+# Run-state growth bounds, so a save costs the same at depth 5 and depth 95:
+# sectors --back can retreat through, live symlinks (oldest evicted), events kept inline in session_log.json
+HISTORY_LIMIT = int(os.environ.get("LABYRINTH_BACKTRACK_DEPTH", 32))
+SYMLINK_LIMIT = int(os.environ.get("LABYRINTH_MAX_SYMLINKS", 8))
+SESSION_LOG_LIMIT = int(os.environ.get("LABYRINTH_SESSION_EVENTS", 500))
+
+class World:
+    def place(self, path, params, build):
+        # Default worlds build the sector up front and store every entity
+        spec = build(path, params); self.store(path, spec)
+        return spec
+
+class FileWorld(World):
+    # Sectors as real directories under base (the classic layout agents and humans inspect).
+    # scratch=True keeps the whole run in <base>/run instead, optionally a symlink into LABYRINTH_SCRATCH_DIR
+    # (e.g. a tmpfs), so teardown is one rename plus a background delete however deep the run went.
+    def __init__(self, base, scratch=False):
+        self.root = base; self.scratch = scratch
+        self.base = os.path.join(base, "run") if scratch else base
+        if scratch: self.ensure_run()
+
+    def ensure_run(self):
+        if os.path.lexists(self.base): return
+        scratch_dir = os.environ.get("LABYRINTH_SCRATCH_DIR")
+        if scratch_dir:
+            import tempfile
+            os.symlink(tempfile.mkdtemp(prefix="labyrinth_run_", dir=scratch_dir), self.base)
+        else: make_dirs(self.base)
+
+    def store(self, path, spec):
+        room_dir = os.path.join(self.base, path); make_dirs(room_dir)
+        with open(os.path.join(room_dir, "room_info.txt"), "w") as f: IO_STATS['bytes_written'] += f.write(spec['info'])
+        opens = 1
+        for kind in ROOM_KINDS:
+            k_dir = os.path.join(room_dir, kind); make_dirs(k_dir)
+            for f_n in os.listdir(k_dir): os.remove(os.path.join(k_dir, f_n))
+            for f_n, data in spec[kind].items():
+                with open(os.path.join(k_dir, f_n), "w") as f:
+                    if kind == "doors":
+                        f.write(f"leads_to: {data['leads_to']}\n")
+                        if data['locked']: f.write("LOCKED: True")
+                    else: json.dump(data, f, indent=4)
+                    IO_STATS['bytes_written'] += f.tell()
+                opens += 1
+        IO_STATS['opens'] += opens
+
+    def list(self, path, kind):
+        k_dir = os.path.join(self.base, path, kind)
+        return sorted(os.listdir(k_dir)) if os.path.exists(k_dir) else []
+
+    def exists(self, path, kind, name):
+        return os.path.exists(os.path.join(self.base, path, kind, name))
+
+    def read(self, path, kind, name):
+        IO_STATS['opens'] += 1
+        with open(os.path.join(self.base, path, kind, name), "r") as f:
+            if kind != "doors": return json.load(f)
+            d_data = f.read()
+        return {"leads_to": d_data.splitlines()[0].split(": ")[1].strip(), "locked": "LOCKED: True" in d_data}
+
+    def remove(self, path, kind, name):
+        f_p = os.path.join(self.base, path, kind, name)
+        if os.path.exists(f_p): os.remove(f_p)
+
+    def link(self, link_id, source):
+        if self.scratch: self.ensure_run()
+        os.symlink(os.path.join(self.base, source), os.path.join(self.base, "start", link_id))
+
+    def unlink(self, link_id):
+        f_p = os.path.join(self.base, "start", link_id)
+        if os.path.islink(f_p): os.remove(f_p)
+
+    def wipe(self):
+        if self.scratch: return self.drop_run()
+        import shutil
+        for item in os.listdir(self.base):
+            item_path = os.path.join(self.base, item)
+            # Remove all room directories and the 'start' directory contents
+            if os.path.isdir(item_path) and (item.startswith("room_") or item == "start"):
+                if item == "start":
+                    # Keep the directory but clear contents (mobs/items/doors)
+                    for sub in os.listdir(item_path):
+                        sub_p = os.path.join(item_path, sub)
+                        if os.path.isdir(sub_p) and not os.path.islink(sub_p): shutil.rmtree(sub_p)
+                        else: os.remove(sub_p)
+                else:
+                    shutil.rmtree(item_path)
+
+    def drop_run(self):
+        # Detach the run subtree in O(1), start a fresh empty one, and delete the old one in the background
+        trash = os.path.join(self.root, ".trash"); os.makedirs(trash, exist_ok=True)
+        if os.path.islink(self.base): dead = os.path.realpath(self.base); os.remove(self.base)
+        else: dead = os.path.join(trash, f"run_{time.time_ns()}"); os.rename(self.base, dead)
+        self.ensure_run()
+        # Detached process: outlives a one-shot CLI call; also sweeps anything an earlier reaper left behind
+        doomed = [dead] + [os.path.join(trash, n) for n in os.listdir(trash) if os.path.join(trash, n) != dead]
+        import subprocess
+        subprocess.Popen([sys.executable, "-c", "import shutil, sys\nfor p in sys.argv[1:]: shutil.rmtree(p, True)"] + doomed,
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+class MemoryWorld(World):
+    # Same interface as FileWorld, sectors held in dicts (headless simulation, no filesystem)
+    def __init__(self):
+        self.rooms = {}
+
+    def store(self, path, spec):
+        self.rooms[path] = {"info": spec['info'], **{kind: dict(spec[kind]) for kind in ROOM_KINDS}}
+
+    def list(self, path, kind):
+        room = self.rooms.get(path)
+        return sorted(room[kind]) if room else []
+
+    def exists(self, path, kind, name):
+        room = self.rooms.get(path)
+        return bool(room) and name in room[kind]
+
+    def read(self, path, kind, name):
+        return dict(self.rooms[path][kind][name])
+
+    def remove(self, path, kind, name):
+        room = self.rooms.get(path)
+        if room: room[kind].pop(name, None)
+
+    def link(self, link_id, source):
+        pass
+
+    def unlink(self, link_id):
+        pass
+
+    def wipe(self):
+        self.rooms.clear()
+
+class LazyWorld(World):
+    # Only the current sector is tracked: its generation params plus an overlay of looted/purged entries,
+    # kept in world_state.json. Contents are re-derived from the seed on read; --materialize writes dirs.
+    def __init__(self, root, build, persist=True, durability=None):
+        self.root = root; self.build = build; self.persist = persist; self.durability = durability
+        self.state_file = os.path.join(root, "world_state.json")
+        self.state = None; self._spec = None
+        if persist and os.path.exists(self.state_file):
+            IO_STATS['opens'] += 1
+            with open(self.state_file, "r") as f: self.state = json.load(f)
+            if not self.state.get('path'): self.state = None # Marker left by wipe: lazy root, no run in progress
+
+    def place(self, path, params, build):
+        self.state = {"path": path, "params": params, "removed": {"mobs": [], "items": []}}
+        self._spec = None; self.save()
+        return self.spec(path)
+
+    def spec(self, path):
+        if not self.state or self.state['path'] != path: return None
+        if self._spec is None: self._spec = self.build(path, self.state['params'])
+        return self._spec
+
+    def save(self):
+        if not self.persist: return
+        write_json(self.state_file, self.state, mode=self.durability, indent=None)
+
+    def list(self, path, kind):
+        spec = self.spec(path)
+        if not spec: return []
+        gone = self.state['removed'].get(kind, ())
+        return sorted(n for n in spec[kind] if n not in gone)
+
+    def exists(self, path, kind, name):
+        spec = self.spec(path)
+        return bool(spec) and name in spec[kind] and name not in self.state['removed'].get(kind, ())
+
+    def read(self, path, kind, name):
+        return dict(self.spec(path)[kind][name])
+
+    def remove(self, path, kind, name):
+        if self.exists(path, kind, name): self.state['removed'][kind].append(name); self.save()
+
+    def link(self, link_id, source):
+        pass # Symlinks only matter through player['symlinks']; there is no directory to point at
+
+    def unlink(self, link_id):
+        pass
+
+    def wipe(self):
+        self.state = None; self._spec = None
+        FileWorld(self.root).wipe() # Anything materialized for inspection
+        # Keep world_state.json as a marker, so the next --init without --world stays lazy
+        if self.persist: write_json(self.state_file, {"path": None}, mode=self.durability, indent=None)
+
+    def materialize(self):
+        if not self.state: return None
+        path = self.state['path']
+        spec = {"info": self.spec(path)['info'], **{kind: {n: self.read(path, kind, n) for n in self.list(path, kind)} for kind in ROOM_KINDS}}
+        FileWorld(self.root).store(path, spec)
+        return path
+
+class JsonStore:
+    # Volatile run state as whole JSON documents (player_stats.json / combat_state.json)
+    def __init__(self, files, durability=None):
+        self.files = files; self.durability = durability
+
+    def load(self, name):
+        path = self.files[name]
+        if not os.path.exists(path): return None
+        IO_STATS['opens'] += 1
+        with open(path, "r") as f: return json.load(f)
+
+    def save(self, name, data, checkpoint=False):
+        write_json(self.files[name], data, checkpoint, self.durability)
+
+    def delete(self, name):
+        if os.path.exists(self.files[name]): os.remove(self.files[name])
+
+    def paths(self):
+        return list(self.files.values())
+
+class JournalStore:
+    # Append-only journal: one JSON line per save holding only the top-level keys that changed.
+    # Replay stops at a torn tail (crash mid-append); compaction rewrites snapshots via rename.
+    def __init__(self, root, snapshot_every=500, durability=None):
+        self.path = os.path.join(root, "state.journal")
+        self.snapshot_every = snapshot_every; self.durability = fsync_mode(durability)
+        self.objs = {}; self.enc = {}; self.records = 0; self.f = None
+        if os.path.exists(self.path): self.replay()
+
+    def replay(self):
+        good = 0; IO_STATS['opens'] += 1
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"): break
+                try: rec = json.loads(raw)
+                except ValueError: break
+                self.apply(rec); good += len(raw); self.records += 1
+        if good < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f: f.truncate(good) # Drop the torn tail before appending again
+        self.enc = {n: {k: json.dumps(v) for k, v in obj.items()} for n, obj in self.objs.items()}
+
+    def apply(self, rec):
+        n = rec['n']
+        if "snap" in rec: self.objs[n] = rec['snap']
+        elif "set" in rec:
+            obj = self.objs.setdefault(n, {}); obj.update(rec['set'])
+            for k in rec.get('del', []): obj.pop(k, None)
+        elif rec.get('drop'): self.objs.pop(n, None)
+
+    def append(self, rec, checkpoint=False):
+        t0 = time.perf_counter(); opened = self.f is None
+        if opened: self.f = open(self.path, "ab")
+        nbytes = self.f.write((json.dumps(rec) + "\n").encode()); self.f.flush()
+        if should_sync(self.durability, checkpoint): os.fsync(self.f.fileno())
+        count_write(t0, nbytes, opened) # The handle stays open between appends
+        self.records += 1
+        if self.records > self.snapshot_every: self.compact()
+
+    def compact(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for n, obj in self.objs.items(): f.write((json.dumps({"n": n, "snap": obj}) + "\n").encode())
+            if self.durability != "none": f.flush(); os.fsync(f.fileno())
+        if self.f: self.f.close(); self.f = None
+        os.replace(tmp, self.path)
+        if self.durability != "none": fsync_dir(os.path.dirname(self.path))
+        self.records = len(self.objs)
+
+    def load(self, name):
+        return self.objs.get(name)
+
+    def save(self, name, data, checkpoint=False):
+        enc = {k: json.dumps(v) for k, v in data.items()}
+        old = self.enc.get(name)
+        if old is None: rec = {"n": name, "snap": data}
+        else:
+            changed = {k: data[k] for k, e in enc.items() if old.get(k) != e}
+            gone = [k for k in old if k not in enc]
+            if not changed and not gone: return
+            rec = {"n": name, "set": changed}
+            if gone: rec['del'] = gone
+        self.enc[name] = enc; self.objs[name] = data
+        self.append(rec, checkpoint)
+
+    def delete(self, name):
+        if name not in self.objs: return
+        self.objs.pop(name); self.enc.pop(name, None)
+        self.append({"n": name, "drop": True})
+
+    def paths(self):
+        return [self.path]
+
+# Per-call timers installed by Metrics (instance attributes, so nothing is wrapped unless metrics are on)
+TIMED_METHODS = ("load_player", "save_player", "generate_room", "combat_turn", "enter_room")
+IO_KEYS = ("opens", "bytes_written", "dirs_created")
+
+def metrics_file(root, metrics=None):
+    # metrics: None (LABYRINTH_METRICS), False/"0" off, True/"1" <root>/metrics.jsonl, or a file path
+    if metrics is None: metrics = os.environ.get("LABYRINTH_METRICS")
+    if metrics in (None, False, "", "0"): return None
+    return os.path.join(root, "metrics.jsonl") if metrics in (True, "1") else os.path.abspath(metrics)
+
+def percentiles(samples):
+    s = sorted(samples); n = len(s)
+    return {"n": n, "p50": s[n // 2], "p95": s[min(n - 1, int(n * 0.95))], "p99": s[min(n - 1, int(n * 0.99))], "max": s[-1]}
+
+class Metrics:
+    # Opt-in instrumentation: latency of every command, each call to TIMED_METHODS, and the I/O it caused.
+    # One JSON line per command goes to the metrics file so short-lived CLI processes add up; with no file
+    # (persist=False) the last `keep` records stay in memory.
+    def __init__(self, path=None, keep=10000):
+        self.path = path; self.records = deque(maxlen=keep); self.calls = {}; self.io = dict(IO_STATS)
+
+    def timed(self, name, fn):
+        def timer(*args, **kwargs):
+            t0 = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: self.calls.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+        return timer
+
+    def record(self, cmd, ms):
+        io = {k: IO_STATS[k] - self.io[k] for k in IO_KEYS}; self.io = dict(IO_STATS)
+        rec = {"cmd": cmd, "ms": round(ms, 4), "methods": {k: [round(x, 4) for x in v] for k, v in self.calls.items()}, "io": io}
+        self.calls = {}
+        if self.path:
+            with open(self.path, "a") as f: f.write(json.dumps(rec) + "\n")
+        else: self.records.append(rec)
+
+    def load(self):
+        recs = list(self.records)
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r") as f: recs += [json.loads(l) for l in f if l.strip()]
+        return recs
+
+    def summary(self):
+        recs = self.load(); cmds = {}; methods = {}; io = dict.fromkeys(IO_KEYS, 0)
+        for r in recs:
+            cmds.setdefault(r['cmd'], []).append(r['ms'])
+            for k, v in r['methods'].items(): methods.setdefault(k, []).extend(v)
+            for k in IO_KEYS: io[k] += r['io'].get(k, 0)
+        return {"records": len(recs), "commands": {k: percentiles(v) for k, v in sorted(cmds.items())},
+                "methods": {k: percentiles(v) for k, v in sorted(methods.items()) if v}, "io": io}
+
 class DelveEngine:
-    def __init__(self, seed=None):
+    def __init__(self, seed=None, verbose=True, world=None, persist=True, globals=None, rng=None, root=None, state=None, durability=None,
+                 metrics=None, profile=None):
+        # verbose=False keeps output in self.lines instead of printing (in-process API)
+        # persist=False never touches the state files; pair with MemoryWorld for a headless run
+        self.verbose = verbose
+        self.persist = persist
+        # Game root: state files and sector directories live here (defaults to the engine's own dir)
+        self.root = game_root(root)
+        # durability: fsync policy for state writes, see FSYNC_MODES (also --fsync / LABYRINTH_FSYNC)
+        self.durability = fsync_mode(durability)
+        if self.durability not in FSYNC_MODES: raise ValueError(f"Unknown fsync mode {self.durability!r} (expected one of {FSYNC_MODES})")
+        if persist: os.makedirs(self.root, exist_ok=True)
+        self.player_file = os.path.join(self.root, "player_stats.json")
+        self.global_file = os.path.join(self.root, "global_stats.json")
+        self.log_file = os.path.join(self.root, "session_log.json")
+        self.session_archive = os.path.join(self.root, "session_log.archive.jsonl")
+        self.boss_file = os.path.join(self.root, "boss_state.json")
+        self.combat_file = os.path.join(self.root, "combat_state.json")
+        self.action_file = os.path.join(self.root, "action_log.jsonl")
+        self.action_archive = action_archive(self.action_file)
+        # world: a World object, or "files" | "scratch" | "memory" | "lazy" (also --world / LABYRINTH_WORLD).
+        # A root holding world_state.json is a lazy run and keeps being one; a root holding run/ stays scratch.
+        if world is None:
+            world = os.environ.get("LABYRINTH_WORLD")
+            if not world and persist and os.path.exists(os.path.join(self.root, "world_state.json")): world = "lazy"
+            elif not world and persist and os.path.lexists(os.path.join(self.root, "run")): world = "scratch"
+            elif not world: world = "files"
+        if world == "files": world = FileWorld(self.root)
+        elif world == "scratch": world = FileWorld(self.root, scratch=True)
+        elif world == "memory": world = MemoryWorld()
+        elif world == "lazy": world = LazyWorld(self.root, self.room_spec, persist, self.durability)
+        self.world = world
+        # state: "json" (whole-file rewrites) or "journal" (append-only deltas); also --state / LABYRINTH_STATE.
+        # A root holding state.journal keeps using it.
+        if state is None:
+            state = os.environ.get("LABYRINTH_STATE") or ("journal" if os.path.exists(os.path.join(self.root, "state.journal")) else "json")
+        if state == "journal": self.store = JournalStore(self.root, durability=self.durability)
+        else: self.store = JsonStore({"player": self.player_file, "combat": self.combat_file}, self.durability)
+        # Non-room rolls (combat, interception, leaks, loot) come from per-run streams, see roll();
+        # passing rng pins every stream to that one generator instead
+        self.rng = rng
+        self.lines = []
+        # Structured events of the current command (see emit); listeners get them the moment they happen
+        self.events = []; self.listeners = []
+        self.over = None
+        self.deferred = False # resolve_combat holds state writes until the fight is over
+        # metrics: see metrics_file (also LABYRINTH_METRICS); profile: a directory that gets one cProfile .prof
+        # per command (also LABYRINTH_PROFILE). Both wrap methods on this instance only, so they cost nothing when off.
+        path = metrics_file(self.root, metrics)
+        self.metrics = Metrics(path if persist else None) if path else None
+        self.profile_dir = profile or os.environ.get("LABYRINTH_PROFILE") or None
+        self.in_command = False
+        if self.metrics:
+            for name in TIMED_METHODS: setattr(self, name, self.metrics.timed(name, getattr(self, name)))
+        if self.metrics or self.profile_dir: self.execute = self.instrument(self.execute)
         self.player = self.load_player()
         # Use existing run seed or default
         self.seed = self.player.get('seed', WORLD_SEED)
-        self.globals = self.load_global()
-        self.session = self.load_session()
+        # global_stats.json and session_log.json are read on first use (see the properties below):
+        # most actions touch neither, and the session log only grows
+        self._globals = globals; self._session = None
+        self.combat = self.load_combat()
+
+    @property
+    def globals(self):
+        if self._globals is None: self._globals = self.load_global()
+        return self._globals
+
+    @globals.setter
+    def globals(self, value):
+        self._globals = value
+
+    @property
+    def session(self):
+        if self._session is None: self._session = self.load_session()
+        return self._session
+
+    def instrument(self, execute):
+        def run(argv, *args, **kwargs):
+            if self.in_command: return execute(argv, *args, **kwargs) # --json re-enters execute: one record per command
+            self.in_command = True; prof = None; t0 = time.perf_counter()
+            if self.profile_dir:
+                import cProfile
+                prof = cProfile.Profile(); prof.enable()
+            try: return execute(argv, *args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000; self.in_command = False
+                cmd = next((a for a in argv if a != "--json"), "--status")
+                if prof:
+                    prof.disable(); os.makedirs(self.profile_dir, exist_ok=True)
+                    prof.dump_stats(os.path.join(self.profile_dir, f"{time.time_ns()}_{cmd.lstrip('-')}.prof"))
+                if self.metrics and cmd != "--metrics": self.metrics.record(cmd, ms)
+        return run
+
+    def say(self, msg):
+        self.lines.append(msg)
+        if self.verbose: print(msg)
+
+    def on(self, listener):
+        # listener(event) is called synchronously for every event; returns it so callers can off() it later
+        self.listeners.append(listener); return listener
+
+    def off(self, listener):
+        if listener in self.listeners: self.listeners.remove(listener)
+
+    def emit(self, kind, **data):
+        # Kinds: run_start, room, combat_start, turn, purged, level_up, terminated, conquered
+        event = {"event": kind, **data}
+        self.events.append(event)
+        for listener in list(self.listeners): listener(event)
 
     def load_global(self):
-        if os.path.exists(GLOBAL_FILE):
-            with open(GLOBAL_FILE, "r") as f: return json.load(f)
+        if self.persist and os.path.exists(self.global_file):
+            IO_STATS['opens'] += 1
+            with open(self.global_file, "r") as f: return json.load(f)
         return {"total_xp": 0, "base_hp": 50, "base_atk": 5, "base_crit": 10, "base_dodge": 15, "base_seed": WORLD_SEED}
 
     def save_global(self):
-        with open(GLOBAL_FILE, "w") as f: json.dump(self.globals, f, indent=4)
+        if not self.persist: return
+        write_json(self.global_file, self.globals, checkpoint=True, mode=self.durability)
 
     def load_player(self):
-        if os.path.exists(PLAYER_FILE):
-            with open(PLAYER_FILE, "r") as f:
-                p = json.load(f)
-                p.setdefault("dr", 0); p.setdefault("percent_dmg", 0); p.setdefault("shield_turns", 0)
-                p.setdefault("lvl", 1); p.setdefault("xp_to_lvl", 200); p.setdefault("path_history", [])
-                p.setdefault("class", "Novice"); p.setdefault("mem_capacity", 256); p.setdefault("mem_used", 0)
-                p.setdefault("fragmentation", 0); p.setdefault("symlinks", []); p.setdefault("seed", WORLD_SEED)
-                return p
+        p = self.store.load("player") if self.persist else None
+        if p:
+            p.setdefault("dr", 0); p.setdefault("percent_dmg", 0); p.setdefault("shield_turns", 0)
+            p.setdefault("lvl", 1); p.setdefault("xp_to_lvl", 200); p.setdefault("path_history", [])
+            p.setdefault("class", "Novice"); p.setdefault("mem_capacity", 256); p.setdefault("mem_used", 0)
+            p.setdefault("fragmentation", 0); p.setdefault("symlinks", []); p.setdefault("seed", WORLD_SEED)
+            return p
         # If no player file, we return a shell that reset_run will fill
         return {"seed": WORLD_SEED}
 
-    def reset_run(self):
+
+    def reset_run(self, seed=None):
         # Generate a new unique seed for this run
-        new_seed = hashlib.md5(str(time.time()).encode()).hexdigest()[:10]
+        import hashlib
+        new_seed = seed or hashlib.md5(str(time.time()).encode()).hexdigest()[:10]
         new_p = {
             "seed": new_seed,
             "hp": self.globals['base_hp'], "max_hp": self.globals['base_hp'],
@@ -109,23 +660,55 @@ class DelveEngine:
             "xp": 0, "lvl": 1, "xp_to_lvl": 200, "shield_turns": 0,
             "room_path": "start", "depth": 0, "inventory": [], "corruption": 0,
             "backlog": [], "keys": 0, "path_history": [], "overclocked": False, "battles_won": 0,
-            "class": "Novice", "mem_capacity": 256, "mem_used": 0, "fragmentation": 0, "symlinks": []
+            "class": "Novice", "mem_capacity": 256, "mem_used": 0, "fragmentation": 0, "symlinks": [], "rng": {}
         }
         self.seed = new_seed
         self.player = new_p
-        self.save_player(new_p)
+        self.over = None
+        self.save_player(new_p, checkpoint=True)
         return new_p
 
-    def save_player(self, data):
-        with open(PLAYER_FILE, "w") as f: json.dump(data, f, indent=4)
+    def roll(self, stream):
+        # One draw site = one Random seeded from (run seed, stream, counter). Counters live in the player,
+        # so a reloaded, forwarded or replayed run continues the exact same sequence.
+        if self.rng is not None: return self.rng
+        counters = self.player.setdefault('rng', {})
+        n = counters.get(stream, 0); counters[stream] = n + 1
+        import random
+        return random.Random(f"{self.seed}:{stream}:{n}")
+
+    def save_player(self, data, checkpoint=False):
+        # checkpoint=True marks run-level milestones (new run, sector change) for the "checkpoint" fsync policy
+        if not self.persist or self.deferred: return
+        self.store.save("player", data, checkpoint)
 
     def load_session(self):
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r") as f: return json.load(f)
+        if self.persist and os.path.exists(self.log_file):
+            IO_STATS['opens'] += 1
+            with open(self.log_file, "r") as f: return json.load(f)
         return {"start_time": time.time(), "events": []}
 
     def save_session(self):
-        with open(LOG_FILE, "w") as f: json.dump(self.session, f, indent=4)
+        # Rotation: events beyond SESSION_LOG_LIMIT move to an append-only archive, so the rewrite stays bounded.
+        # Archive first: a crash in between can only duplicate an event, never lose one.
+        events = self.session['events']; cut = len(events) - SESSION_LOG_LIMIT
+        if cut > 0:
+            if self.persist:
+                with open(self.session_archive, "a") as f: f.write("".join(json.dumps(e) + "\n" for e in events[:cut]))
+            del events[:cut]
+        if not self.persist: return
+        write_json(self.log_file, self.session, checkpoint=True, mode=self.durability)
+
+    def load_combat(self):
+        return self.store.load("combat") if self.persist else None
+
+    def save_combat(self):
+        if not self.persist or self.deferred: return
+        self.store.save("combat", self.combat)
+
+    def clear_combat(self):
+        self.combat = None
+        if self.persist and not self.deferred: self.store.delete("combat")
 
     def check_level_up(self):
         while self.player['xp'] >= self.player['xp_to_lvl']:
@@ -138,10 +721,11 @@ class DelveEngine:
             if p['dr'] >= 5 or p['max_hp'] > 200: p['class'] = "SysAdmin (Tank)"
             elif p['dodge'] > 40 or p['crit'] > 25: p['class'] = "Ghost (Rogue)"
             elif p['atk'] > 40: p['class'] = "Netrunner (DPS)"
-            print(f"KERNEL UPGRADED TO LVL {self.player['lvl']}! Class: {p['class']}")
+            self.say(f"KERNEL UPGRADED TO LVL {self.player['lvl']}! Class: {p['class']}")
+            self.emit("level_up", lvl=p['lvl'], cls=p['class'])
 
-    def get_rarity(self, rng):
-        roll = rng.random(); cumulative = 0; depth = self.player['depth']
+    def get_rarity(self, rng, depth=None):
+        roll = rng.random(); cumulative = 0; depth = self.player['depth'] if depth is None else depth
         avail = ["COMMON"]
         if depth >= 10: avail.append("RARE")
         if depth >= 20: avail.append("ELITE")
@@ -151,21 +735,18 @@ class DelveEngine:
             if roll <= cumulative: return n
         return "COMMON"
 
-    def get_scaled_mob(self, mob_id, rng, forced_rarity=None, is_ghost=False):
-        all_mobs = {**MOBS, **SPECIAL_MOBS}
-        mob = copy.deepcopy(all_mobs[mob_id])
-        rarity_name = forced_rarity if forced_rarity else self.get_rarity(rng)
-        rarity = RARITIES[rarity_name]; depth = self.player['depth']
-        d_mult = 1.0 + (depth // 5) * 0.1
-        if mob_id in SPECIAL_MOBS and mob_id >= 0x10: d_mult = min(1.3, d_mult)
-        c_mult = 1.0 + (self.player['corruption'] / 100.0) * 0.5 if depth >= 20 else 1.0
-        if depth >= 20: d_mult += 0.2
-        if depth >= 50: d_mult += 0.5
-        g_mult = 1.2 if is_ghost else 1.0
-        f_mult = d_mult * rarity['stat_mult'] * c_mult * g_mult
-        mob['name'] = ("[GHOST] " if is_ghost else "") + rarity['color'] + mob['name']
-        mob['hp'] = int(mob['hp'] * f_mult); mob['atk'] = int(mob['atk'] * f_mult)
-        mob['xp'] = int(mob['xp'] * d_mult * rarity['xp_mult'])
+    def get_scaled_mob(self, mob_id, rng, forced_rarity=None, is_ghost=False, depth=None, corruption=None):
+        # depth/corruption default to the live player; room builds pass the values frozen at generation
+        depth = self.player['depth'] if depth is None else depth
+        corruption = self.player['corruption'] if corruption is None else corruption
+        rarity_name = forced_rarity if forced_rarity else self.get_rarity(rng, depth)
+        key = (mob_id, depth // 5, rarity_name, is_ghost)
+        rec = MOB_SCALES.get(key)
+        if rec is None: rec = MOB_SCALES[key] = mob_scale(*key)
+        c_mult = 1.0 + (corruption / 100.0) * 0.5 if depth >= 20 else 1.0
+        f_mult = rec.k * c_mult * rec.g
+        mob = {"name": rec.name, "hp": int(rec.hp * f_mult), "atk": int(rec.atk * f_mult), "xp": rec.xp}
+        if rec.traits is not None: mob['traits'] = list(rec.traits)
         return mob
 
     def defrag(self):
@@ -173,20 +754,23 @@ class DelveEngine:
         if self.player['xp'] >= cost:
             self.player['xp'] -= cost
             self.player['fragmentation'] = 0
-            print(f"{Colors.CYAN}>> DEFRAG COMPLETE: Memory address space consolidated.{Colors.END}"); self.save_player(self.player)
-        else: print(f"Need {cost} XP to defrag.")
+            self.say(f"{Colors.CYAN}>> DEFRAG COMPLETE: Memory address space consolidated.{Colors.END}"); self.save_player(self.player)
+            return {"ok": True, "cost": cost}
+        self.say(f"Need {cost} XP to defrag.")
+        return {"ok": False, "error": "xp"}
 
     def loot(self, item_filename):
-        item_path = os.path.join(GAME_DIR, self.player['room_path'], "items", item_filename)
-        if not os.path.exists(item_path): return
-        with open(item_path, "r") as f: item = json.load(f)
+        room = self.player['room_path']
+        if not self.world.exists(room, "items", item_filename): return {"ok": False, "error": "missing"}
+        item = self.world.read(room, "items", item_filename)
         size = item.get('size', 16)
         if self.player['mem_used'] + self.player['fragmentation'] + size > self.player['mem_capacity']:
-            print(f"{Colors.RED}[!] MALLOC FAILURE: Buffer too fragmented or full ({self.player['mem_used']}+{self.player['fragmentation']}+{size} > {self.player['mem_capacity']}){Colors.END}")
-            return
-        print(f"{Colors.GREEN}Buffer + {item['name']} ({size} bytes){Colors.END}")
+            self.say(f"{Colors.RED}[!] MALLOC FAILURE: Buffer too fragmented or full ({self.player['mem_used']}+{self.player['fragmentation']}+{size} > {self.player['mem_capacity']}){Colors.END}")
+            return {"ok": False, "error": "malloc", "item": item}
+        self.say(f"{Colors.GREEN}Buffer + {item['name']} ({size} bytes){Colors.END}")
         self.player['inventory'].append(item); self.player['mem_used'] += size
-        os.remove(item_path); self.save_player(self.player)
+        self.world.remove(room, "items", item_filename); self.save_player(self.player)
+        return {"ok": True, "item": item}
 
     def use_item(self, item_name):
         for i, it in enumerate(self.player['inventory']):
@@ -196,7 +780,7 @@ class DelveEngine:
                 self.player['mem_used'] -= size; self.player['fragmentation'] += size
                 if item['type'] == "heal":
                     v = item['value']; self.player['hp'] = min(self.player['max_hp'], self.player['hp'] + v)
-                    print(f"{Colors.GREEN}HP Restored. Hole created: {size} bytes.{Colors.END}")
+                    self.say(f"{Colors.GREEN}HP Restored. Hole created: {size} bytes.{Colors.END}")
                 elif item['type'] == "buff":
                     self.player[item['stat']] += item['value']
                     if 'dr' in item: self.player['dr'] += item['dr']
@@ -204,116 +788,127 @@ class DelveEngine:
                     if item['stat'] == "max_hp": self.player['hp'] += item['value']
                     if item['stat'] == "xp": self.player['xp'] += item['value']
                     if 'atk' in item and item['stat'] != 'atk': self.player['atk'] += item['atk']
-                    print(f"{Colors.YELLOW}Applied {item['name']}. Hole created: {size} bytes.{Colors.END}")
+                    self.say(f"{Colors.YELLOW}Applied {item['name']}. Hole created: {size} bytes.{Colors.END}")
                 elif item['type'] == "key": self.player['keys'] += 1
-                self.save_player(self.player); return
-        print("Item not found.")
+                self.save_player(self.player); return {"ok": True, "item": item}
+        self.say("Item not found.")
+        return {"ok": False, "error": "missing"}
 
     def attack_init(self, mob_filename):
-        mob_path = os.path.join(GAME_DIR, self.player['room_path'], "mobs", mob_filename)
-        if not os.path.exists(mob_path): return
-        with open(mob_path, "r") as f: mob = json.load(f)
-        state = {
+        room = self.player['room_path']
+        if not self.world.exists(room, "mobs", mob_filename): return {"ok": False, "error": "missing"}
+        mob = self.world.read(room, "mobs", mob_filename)
+        self.combat = {
             "mob_name": mob['name'], "mob_hp": mob['hp'], "mob_max_hp": mob['hp'],
             "mob_atk": mob['atk'], "mob_traits": mob.get('traits', []), "mob_xp": mob['xp'],
             "mob_filename": mob_filename, "multiplier": 1.0, "active": True
         }
-        with open(COMBAT_FILE, "w") as f: json.dump(state, f, indent=4)
-        print(f"{Colors.BOLD}{Colors.CYAN}--- I.P. COMBAT INITIALIZED: {mob['name']} ---{Colors.END}")
-        print("Queue Opcode: --op <MOV|NOP|ADD|XOR|LOCK>")
+        self.save_combat()
+        self.emit("combat_start", mob=mob['name'], mob_file=mob_filename, mob_hp=mob['hp'], mob_atk=mob['atk'])
+        self.say(f"{Colors.BOLD}{Colors.CYAN}--- I.P. COMBAT INITIALIZED: {mob['name']} ---{Colors.END}")
+        self.say("Queue Opcode: --op <MOV|NOP|ADD|XOR|LOCK>")
+        return {"ok": True, "combat": self.combat}
 
     def combat_turn(self, opcode):
-        if not os.path.exists(COMBAT_FILE): print("No combat active."); return
-        with open(COMBAT_FILE, "r") as f: c = json.load(f)
-        p = self.player
-        if not c['active']: return
-        
+        if not self.combat: self.say("No combat active."); return {"ok": False, "error": "no_combat"}
+        c = self.combat; p = self.player
+        if not c['active']: return {"ok": False, "error": "inactive"}
+        hp_before = p['hp']; rng = self.roll("combat")
+        res = {"ok": True, "opcode": opcode, "dmg_dealt": 0, "dmg_taken": 0, "outcome": "continue"}
+
         c.setdefault('lock_turns', 0)
         c.setdefault('temp_dr', 0)
         
         # Player Turn
-        print(f">> IP: Executing {opcode}...")
+        self.say(f">> IP: Executing {opcode}...")
         p_dmg = 0
         if opcode == "MOV":
             p_dmg = int(p['atk'] * c['multiplier'])
-            if random.random() < (p['crit'] / 100.0): p_dmg *= 2; print(f"{Colors.RED}{Colors.BOLD}CRITICAL!{Colors.END}")
+            if rng.random() < (p['crit'] / 100.0): p_dmg *= 2; self.say(f"{Colors.RED}{Colors.BOLD}CRITICAL!{Colors.END}")
             c['mob_hp'] -= p_dmg; c['multiplier'] = 1.0
-            print(f"Result: {Colors.GREEN}{p_dmg} DMG{Colors.END} to {c['mob_name']}.")
+            res['dmg_dealt'] += p_dmg
+            self.say(f"Result: {Colors.GREEN}{p_dmg} DMG{Colors.END} to {c['mob_name']}.")
         elif opcode == "NOP":
-            c['multiplier'] *= 2.0; print("Result: CPU Cycle skipped. Next MOV doubled.")
+            c['multiplier'] *= 2.0; self.say("Result: CPU Cycle skipped. Next MOV doubled.")
         elif opcode == "ADD":
-            p['atk'] += 4; print(f"Result: {Colors.YELLOW}ATK permanently increased by 4{Colors.END} for this fight.")
+            p['atk'] += 4; self.say(f"Result: {Colors.YELLOW}ATK permanently increased by 4{Colors.END} for this fight.")
         elif opcode == "XOR":
-            c['temp_dr'] = 10; print(f"Result: {Colors.CYAN}Temporary encryption active. +10 DR and Reflective Shell engaged.{Colors.END}")
+            c['temp_dr'] = 10; self.say(f"Result: {Colors.CYAN}Temporary encryption active. +10 DR and Reflective Shell engaged.{Colors.END}")
         elif opcode == "LOCK":
             if p['keys'] > 0:
                 p['keys'] -= 1; c['lock_turns'] = 3
                 if "Key Devourer" in c['mob_name']:
                     c.setdefault('keys_fed', 0)
                     c['keys_fed'] += 1
-                    print(f"{Colors.YELLOW}>> KEY FEED: The Devourer is occupied with your Sector Key! (System Frozen for 3 turns){Colors.END}")
+                    self.say(f"{Colors.YELLOW}>> KEY FEED: The Devourer is occupied with your Sector Key! (System Frozen for 3 turns){Colors.END}")
                     c['mob_hp'] = min(c['mob_max_hp'], c['mob_hp'] + 100)
                     c['mob_atk'] += 5
-                    print(f">> INCORPORATION: The boss consumed key #{c['keys_fed']}! {Colors.GREEN}+100 HP{Colors.END} and {Colors.YELLOW}+5 ATK{Colors.END}.")
+                    self.say(f">> INCORPORATION: The boss consumed key #{c['keys_fed']}! {Colors.GREEN}+100 HP{Colors.END} and {Colors.YELLOW}+5 ATK{Colors.END}.")
                     
                     fb_dmg = 0
                     if c['keys_fed'] > 30:
-                        print(f"\n{Colors.RED}{Colors.BOLD}!!! CRITICAL OVERLOAD: The Devourer has reached maximum capacity and EXPLODES !!!{Colors.END}")
-                        print(">> The resulting data shockwave vaporizes your core connection.")
+                        self.say(f"\n{Colors.RED}{Colors.BOLD}!!! CRITICAL OVERLOAD: The Devourer has reached maximum capacity and EXPLODES !!!{Colors.END}")
+                        self.say(">> The resulting data shockwave vaporizes your core connection.")
                         self.terminate()
+                        res['outcome'] = "terminated"; return res
                     elif c['keys_fed'] > 20:
-                        print(f"{Colors.RED}>> DISGUST: The Devourer poops out a corrupted memory block. It looks dangerously bloated.{Colors.END}")
+                        self.say(f"{Colors.RED}>> DISGUST: The Devourer poops out a corrupted memory block. It looks dangerously bloated.{Colors.END}")
                         fb_dmg = 41
                     elif c['keys_fed'] > 15:
-                        print(f"{Colors.YELLOW}>> REJECTION: The Devourer barfs uncompiled code! Its internal pressure is rising.{Colors.END}")
+                        self.say(f"{Colors.YELLOW}>> REJECTION: The Devourer barfs uncompiled code! Its internal pressure is rising.{Colors.END}")
                         fb_dmg = 60
                     elif c['keys_fed'] > 8:
-                        print(f"{Colors.CYAN}>> GASEOUS: A digital fart echoes through the sector. The air smells of ozone and burnt silicon.{Colors.END}")
+                        self.say(f"{Colors.CYAN}>> GASEOUS: A digital fart echoes through the sector. The air smells of ozone and burnt silicon.{Colors.END}")
                         fb_dmg = 30
                     else:
-                        print(f"{Colors.GREEN}>> SATIATED: The Devourer lets out a data-heavy burp.{Colors.END}")
+                        self.say(f"{Colors.GREEN}>> SATIATED: The Devourer lets out a data-heavy burp.{Colors.END}")
                         fb_dmg = 10
                     
                     if fb_dmg > 0:
                         # Saturation Density: Fallout becomes harder to dodge as the boss gets full
                         # Key Devourer EMP: Chance to disable Ghosting for this turn
-                        if random.random() < 0.25:
-                            print(f"{Colors.RED}>> EMP: Ghost Protocol disabled by digital shockwave!{Colors.END}")
+                        if rng.random() < 0.25:
+                            self.say(f"{Colors.RED}>> EMP: Ghost Protocol disabled by digital shockwave!{Colors.END}")
                             effective_dodge = 0
                         else:
                             effective_dodge = p['dodge'] - c['keys_fed']
                         
-                        if random.random() < (effective_dodge / 100.0):
-                            print(f"{Colors.CYAN}>> AVOIDED: You dodged the digital fallout!{Colors.END}")
+                        if rng.random() < (effective_dodge / 100.0):
+                            self.say(f"{Colors.CYAN}>> AVOIDED: You dodged the digital fallout!{Colors.END}")
                             p['corruption'] += 1; p['fragmentation'] += 10
                         else:
                             p['hp'] -= fb_dmg
-                            print(f"{Colors.RED}>> FEEDBACK: You took {fb_dmg} damage from the boss's reaction! ({p['hp']}/{p['max_hp']} HP){Colors.END}")
+                            self.say(f"{Colors.RED}>> FEEDBACK: You took {fb_dmg} damage from the boss's reaction! ({p['hp']}/{p['max_hp']} HP){Colors.END}")
                 else:
-                    print(f"{Colors.CYAN}>> KERNEL LOCK: Sector Key used to throttle enemy process. (ATK -50% for 3 turns){Colors.END}")
+                    self.say(f"{Colors.CYAN}>> KERNEL LOCK: Sector Key used to throttle enemy process. (ATK -50% for 3 turns){Colors.END}")
             else:
-                print(f"{Colors.RED}>> NO KEYS left to lock with!{Colors.END}")
+                self.say(f"{Colors.RED}>> NO KEYS left to lock with!{Colors.END}")
         
         if c['mob_hp'] <= 0:
-            print(f"{Colors.PURPLE}{Colors.BOLD}Purged! +{c['mob_xp']} XP{Colors.END}"); p['xp'] += c['mob_xp']; p['battles_won'] += 1; self.check_level_up()
+            self.say(f"{Colors.PURPLE}{Colors.BOLD}Purged! +{c['mob_xp']} XP{Colors.END}"); p['xp'] += c['mob_xp']; p['battles_won'] += 1; self.check_level_up()
+            res['dmg_taken'] = hp_before - p['hp']; res['xp'] = c['mob_xp']
+            self.emit("turn", opcode=opcode, dmg_dealt=res['dmg_dealt'], dmg_taken=res['dmg_taken'], mob_hp=c['mob_hp'], hp=p['hp'])
             if p['depth'] >= 100:
-                print("\n" + "="*40)
-                print(f"{Colors.PURPLE}{Colors.BOLD}>> CORE BREACH SUCCESSFUL: THE LABYRINTH IS CONQUERED <<{Colors.END}")
-                print("="*40 + "\n")
+                self.say("\n" + "="*40)
+                self.say(f"{Colors.PURPLE}{Colors.BOLD}>> CORE BREACH SUCCESSFUL: THE LABYRINTH IS CONQUERED <<{Colors.END}")
+                self.say("="*40 + "\n")
                 self.globals['total_xp'] += p['xp']; self.save_global()
-                self.wipe_traces()
-                sys.exit()
-            if random.random() < 0.25:
-                p['keys'] += 1; print(f"{Colors.GREEN}>> DATA LEAK: Found 1 Sector Key in the wreckage.{Colors.END}")
-            os.remove(os.path.join(GAME_DIR, p['room_path'], "mobs", c['mob_filename']))
-            os.remove(COMBAT_FILE); self.save_player(p); return
+                self.emit("purged", mob=c['mob_name'], xp=c['mob_xp'])
+                self.wipe_traces(); self.end_run("conquered")
+                res['outcome'] = "conquered"; return res
+            if self.roll("loot").random() < 0.25:
+                p['keys'] += 1; self.say(f"{Colors.GREEN}>> DATA LEAK: Found 1 Sector Key in the wreckage.{Colors.END}")
+            self.world.remove(p['room_path'], "mobs", c['mob_filename'])
+            self.emit("purged", mob=c['mob_name'], xp=c['mob_xp'])
+            self.clear_combat(); self.save_player(p)
+            res['outcome'] = "purged"; return res
 
         # Mob Turn
         hit = True
         is_stunned = c.get('lock_turns', 0) > 0 and "Key Devourer" in c['mob_name']
         
         if is_stunned:
-            print(f"{Colors.CYAN}>> STUNNED: Key Devourer is busy eating! ({c['lock_turns']} turns left){Colors.END}")
+            self.say(f"{Colors.CYAN}>> STUNNED: Key Devourer is busy eating! ({c['lock_turns']} turns left){Colors.END}")
             c['lock_turns'] -= 1
             hit = False
         elif True: # All attacks now follow the same logic with different tracking bonuses
@@ -323,15 +918,15 @@ class DelveEngine:
             
             boss_tracking = 0
             if "unavoidable" in c['mob_traits']: 
-                print(f"{Colors.RED}HIGH ACCURACY!{Colors.END}")
+                self.say(f"{Colors.RED}HIGH ACCURACY!{Colors.END}")
                 boss_tracking = 40
             elif "true_dmg" in c['mob_traits']: 
                 boss_tracking = 15
 
             effective_dodge = max(0, p['dodge'] - c['evasion_penalty'] - c['tracking_bonus'] - boss_tracking)
             
-            if random.random() < (effective_dodge / 100.0): 
-                print(f"{Colors.CYAN}EVADED!{Colors.END}")
+            if rng.random() < (effective_dodge / 100.0): 
+                self.say(f"{Colors.CYAN}EVADED!{Colors.END}")
                 p['corruption'] += 1; p['fragmentation'] += 10
                 c['evasion_penalty'] += 5 
                 c['tracking_bonus'] += 20 # Aggressive Tracking
@@ -339,7 +934,7 @@ class DelveEngine:
                 # Static Friction: Minimal chip damage on dodge
                 chip_dmg = max(1, int(c['mob_atk'] * 0.10))
                 p['hp'] -= chip_dmg
-                print(f"{Colors.YELLOW}>> STATIC FRICTION: Evasion generated {chip_dmg} True Damage. ({p['hp']}/{self.player['max_hp']} HP){Colors.END}")
+                self.say(f"{Colors.YELLOW}>> STATIC FRICTION: Evasion generated {chip_dmg} True Damage. ({p['hp']}/{self.player['max_hp']} HP){Colors.END}")
                 hit = False
             else:
                 c['tracking_bonus'] = 0 # Reset tracking on successful hit
@@ -347,232 +942,603 @@ class DelveEngine:
         
         if hit:
             effective_dr = p['dr'] + c.get('temp_dr', 0)
-            variance = random.uniform(0.85, 1.15)
+            variance = rng.uniform(0.85, 1.15)
             
             if "true_dmg" in c['mob_traits']:
                 # True Damage now means high penetration (ignores 75% of DR)
                 dmg = max(1, int((c['mob_atk'] * variance) - (effective_dr * 0.25)))
-                print(f"{Colors.RED}PENETRATION!{Colors.END}")
+                self.say(f"{Colors.RED}PENETRATION!{Colors.END}")
             else:
                 dmg = max(1, int((c['mob_atk'] * variance) - effective_dr))
                 
             if c.get('lock_turns', 0) > 0:
-                dmg //= 2; c['lock_turns'] -= 1; print(f"{Colors.CYAN}>> THROTTLED: Kernel Lock active ({c['lock_turns']} turns left){Colors.END}")
+                dmg //= 2; c['lock_turns'] -= 1; self.say(f"{Colors.CYAN}>> THROTTLED: Kernel Lock active ({c['lock_turns']} turns left){Colors.END}")
             
-            if "crit" in c['mob_traits'] and random.random() < 0.25:
-                dmg *= 2; print(f"{Colors.RED}{Colors.BOLD}ENEMY CRIT!{Colors.END}")
+            if "crit" in c['mob_traits'] and rng.random() < 0.25:
+                dmg *= 2; self.say(f"{Colors.RED}{Colors.BOLD}ENEMY CRIT!{Colors.END}")
             # Race Condition Check
-            if "race_condition" in c['mob_traits'] and random.random() < 0.3:
-                print(f"{Colors.RED}>> RACE CONDITION: Mob injected code into your pipeline!{Colors.END}"); p['hp'] -= p_dmg
-                print(f"You struck yourself for {Colors.RED}{p_dmg} DMG!{Colors.END}")
+            if "race_condition" in c['mob_traits'] and rng.random() < 0.3:
+                self.say(f"{Colors.RED}>> RACE CONDITION: Mob injected code into your pipeline!{Colors.END}"); p['hp'] -= p_dmg
+                self.say(f"You struck yourself for {Colors.RED}{p_dmg} DMG!{Colors.END}")
             
-            p['hp'] -= dmg; print(f"Took {Colors.RED}{dmg} DMG{Colors.END} ({p['hp']}/{p['max_hp']} HP)")
+            p['hp'] -= dmg; self.say(f"Took {Colors.RED}{dmg} DMG{Colors.END} ({p['hp']}/{p['max_hp']} HP)")
             if opcode == "XOR":
                 reflect = dmg // 4; c['mob_hp'] -= reflect; c['temp_dr'] = 0 # Reset temp bonus
-                print(f"{Colors.GREEN}>> REFLECTED: {reflect} DMG returned to {c['mob_name']}.{Colors.END}")
+                res['dmg_dealt'] += reflect
+                self.say(f"{Colors.GREEN}>> REFLECTED: {reflect} DMG returned to {c['mob_name']}.{Colors.END}")
 
-        if p['hp'] <= 0: self.terminate()
-        with open(COMBAT_FILE, "w") as f: json.dump(c, f, indent=4)
+        res['dmg_taken'] = hp_before - p['hp']
+        self.emit("turn", opcode=opcode, dmg_dealt=res['dmg_dealt'], dmg_taken=res['dmg_taken'], mob_hp=c['mob_hp'], hp=p['hp'])
+        if p['hp'] <= 0:
+            self.terminate()
+            res['outcome'] = "terminated"; return res
+        self.save_combat()
         self.save_player(p)
+        return res
+
+    def resolve_combat(self, policy="MOV", mob_filename=None, max_turns=500):
+        # Whole fight in one call. policy: "LOCK,MOV,..." (cycled) or callable(player, combat, turn) -> opcode,
+        # where a callable may also answer "PURGE" or "OVERCLOCK". State is written once, when the fight ends.
+        if isinstance(policy, str):
+            ops = [op.strip().upper() for op in policy.split(",") if op.strip()] or ["MOV"]
+            policy = lambda p, c, turn: ops[turn % len(ops)]
+        if mob_filename:
+            res = self.attack_init(mob_filename)
+            if not res['ok']: return res
+        if not self.combat: self.say("No combat active."); return {"ok": False, "error": "no_combat"}
+        mob = self.combat['mob_name']; turns = []; outcome = "continue"
+        self.deferred = True
+        try:
+            for turn in range(max_turns):
+                op = policy(self.player, self.combat, turn)
+                if op == "PURGE": res = self.purge()
+                elif op == "OVERCLOCK": res = self.overclock()
+                else: res = self.combat_turn(op)
+                entry = {"turn": turn, "opcode": op, "ok": res['ok'], "dmg_dealt": res.get('dmg_dealt', 0),
+                         "dmg_taken": res.get('dmg_taken', 0), "outcome": res.get('outcome', "continue")}
+                if self.combat: entry['mob_hp'] = self.combat['mob_hp']
+                if 'hp' in self.player: entry['hp'] = self.player['hp']
+                turns.append(entry); outcome = entry['outcome']
+                if not res['ok'] or outcome != "continue" or not self.combat: break
+        finally:
+            self.deferred = False
+        if not self.over:
+            self.save_player(self.player)
+            if self.combat: self.save_combat()
+            elif self.persist: self.store.delete("combat")
+        return {"ok": True, "mob": mob, "outcome": outcome if outcome != "continue" else "unresolved", "turns": turns,
+                "dmg_dealt": sum(t['dmg_dealt'] for t in turns), "dmg_taken": sum(t['dmg_taken'] for t in turns)}
 
     def symlink(self):
-        if self.player['xp'] < 200: print("Need 200 XP for Symlink."); return
+        if self.player['xp'] < 200: self.say("Need 200 XP for Symlink."); return {"ok": False, "error": "xp"}
         self.player['xp'] -= 200
         link_id = f"link_{int(time.time())}"
-        safe_path = os.path.join(GAME_DIR, "start", link_id)
-        current_path = os.path.join(GAME_DIR, self.player['room_path'])
-        os.symlink(current_path, safe_path)
-        self.player['symlinks'].append({"id": link_id, "source": self.player['room_path']})
-        print(f">> SYMLINK CREATED: {link_id} -> {self.player['room_path']}")
+        self.world.link(link_id, self.player['room_path'])
+        links = self.player['symlinks']; links.append({"id": link_id, "source": self.player['room_path']})
+        self.say(f">> SYMLINK CREATED: {link_id} -> {self.player['room_path']}")
+        while len(links) > SYMLINK_LIMIT:
+            old = links.pop(0); self.world.unlink(old['id']); self.say(f">> SYMLINK EVICTED: {old['id']}")
         self.save_player(self.player)
+        return {"ok": True, "link": link_id}
 
     def generate_room(self, path, door_type="ROOT", is_backtrack=False):
-        room_seed = hashlib.sha256((self.seed + path).encode()).hexdigest()
-        rng = random.Random(room_seed); depth = self.player['depth']
-        room_dir = os.path.join(GAME_DIR, path); os.makedirs(room_dir, exist_ok=True)
-        with open(os.path.join(room_dir, "room_info.txt"), "w") as f:
-            f.write(f"--- SECTOR {path.upper()} ---\n")
-            if is_backtrack: f.write("RE-ENTRY DETECTED.\n")
-            f.write(f"DEPTH: {depth} | LVL: {self.player['lvl']} | CLASS: {self.player['class']}\n")
-            f.write(DOOR_TYPES[door_type]["desc"] + "\nStatus: Awaiting input...\n")
-        mobs_dir = os.path.join(room_dir, "mobs"); os.makedirs(mobs_dir, exist_ok=True)
-        for f_n in os.listdir(mobs_dir): os.remove(os.path.join(mobs_dir, f_n))
-        
+        p = self.player; leaks = 0
         # Mobs can follow symlinks!
-        if path == "start":
-            for link in self.player['symlinks']:
-                if random.random() < 0.3:
-                    print(f"[!] WARNING: Signal leakage detected from {link['id']}!")
-                    mob = self.get_scaled_mob(0x01, rng); mob['name'] = f"[LEAK] {mob['name']}"
-                    with open(os.path.join(mobs_dir, f"LEAK_{mob['name']}.json"), "w") as f: json.dump(mob, f, indent=4)
+        if path == "start" and p['symlinks']:
+            rng = self.roll("leak")
+            for link in p['symlinks']:
+                if rng.random() < 0.3:
+                    self.say(f"[!] WARNING: Signal leakage detected from {link['id']}!"); leaks += 1
+        # Everything a sector contains is a pure function of these params
+        params = {"seed": self.seed, "door_type": door_type, "backtrack": is_backtrack, "depth": p['depth'],
+                  "lvl": p['lvl'], "class": p['class'], "corruption": p['corruption'], "leaks": leaks}
+        return self.world.place(path, params, self.room_spec)
+
+    def room_spec(self, path, params):
+        # lvl/class only show up in the info text: the contents are cached without them and the info is rebuilt per call
+        contents = ROOM_CACHE.get(path, {k: v for k, v in params.items() if k not in ROOM_INFO_PARAMS}, self.build_contents)
+        return dict(contents, info=self.room_info(path, params))
+
+    def build_room(self, path, params):
+        return dict(self.build_contents(path, params), info=self.room_info(path, params))
+
+    def room_info(self, path, params):
+        info = f"--- SECTOR {path.upper()} ---\n"
+        if params['backtrack']: info += "RE-ENTRY DETECTED.\n"
+        info += f"DEPTH: {params['depth']} | LVL: {params['lvl']} | CLASS: {params['class']}\n"
+        return info + DOOR_TYPES[params['door_type']]["desc"] + "\nStatus: Awaiting input...\n"
+
+    def build_contents(self, path, params):
+        import hashlib, random
+        room_seed = hashlib.sha256((params['seed'] + path).encode()).hexdigest()
+        rng = random.Random(room_seed); depth = params['depth']; corruption = params['corruption']
+        door_type = params['door_type']; is_backtrack = params['backtrack']
+        mobs, items, doors = {}, {}, {}
+        
+        for _ in range(params['leaks']):
+            mob = self.get_scaled_mob(0x01, rng, depth=depth, corruption=corruption); mob['name'] = f"[LEAK] {mob['name']}"
+            mobs[f"LEAK_{mob['name']}.json"] = mob
 
         if depth > 0 and depth <= 100 and depth % 10 == 0:
             boss_id = 0x10 * (depth // 10)
             if boss_id in SPECIAL_MOBS:
-                mob = self.get_scaled_mob(boss_id, rng, forced_rarity="COMMON")
-                with open(os.path.join(mobs_dir, f"BOSS_{mob['name'].replace(' ', '_')}.json"), "w") as f: json.dump(mob, f, indent=4)
+                mob = self.get_scaled_mob(boss_id, rng, forced_rarity="COMMON", depth=depth, corruption=corruption)
+                mobs[f"BOSS_{mob['name'].replace(' ', '_')}.json"] = mob
         elif rng.random() > 0.4:
             available_mobs = list(MOBS.keys())
             if depth >= 80: available_mobs.extend([0x04, 0x05])
-            mob = self.get_scaled_mob(rng.choice(available_mobs), rng, is_ghost=(is_backtrack and rng.random() < 0.5))
-            with open(os.path.join(mobs_dir, f"{mob['name'].replace(' ', '_')}.json"), "w") as f: json.dump(mob, f, indent=4)
+            mob = self.get_scaled_mob(rng.choice(available_mobs), rng, is_ghost=(is_backtrack and rng.random() < 0.5), depth=depth, corruption=corruption)
+            mobs[f"{mob['name'].replace(' ', '_')}.json"] = mob
         
-        items_dir = os.path.join(room_dir, "items"); os.makedirs(items_dir, exist_ok=True)
-        for f_n in os.listdir(items_dir): os.remove(os.path.join(items_dir, f_n))
         loot_table = DOOR_TYPES[door_type].get("loot_table", [0x20, 0x23])
         if depth % 10 == 9:
             it = ITEMS[0x40] # Protocol Shield
-            with open(os.path.join(items_dir, f"{it['name']}.json"), "w") as f: json.dump(it, f, indent=4)
+            items[f"{it['name']}.json"] = it
             it_key = ITEMS[0x23] # Sector Key
-            with open(os.path.join(items_dir, f"{it_key['name']}.json"), "w") as f: json.dump(it_key, f, indent=4)
+            items[f"{it_key['name']}.json"] = it_key
         elif rng.random() < 0.5:
             item_id = rng.choice(loot_table) if rng.random() < 0.8 else rng.choice([0x20, 0x23])
             it = ITEMS[item_id]
-            with open(os.path.join(items_dir, f"{it['name']}.json"), "w") as f: json.dump(it, f, indent=4)
+            items[f"{it['name']}.json"] = it
         
-        doors_dir = os.path.join(room_dir, "doors"); os.makedirs(doors_dir, exist_ok=True)
-        for f_n in os.listdir(doors_dir): os.remove(os.path.join(doors_dir, f_n))
         for i in range(rng.randint(1, 3)):
             dt = rng.choice(list(DOOR_TYPES.keys()))
-            with open(os.path.join(doors_dir, f"door_{i}_{dt.lower()}.gate"), "w") as f:
-                f.write(f"leads_to: {dt}\n")
-                if depth > 0 and depth % 10 == 0: f.write("LOCKED: True")
+            doors[f"door_{i}_{dt.lower()}.gate"] = {"leads_to": dt, "locked": depth > 0 and depth % 10 == 0}
+        return {"mobs": mobs, "items": items, "doors": doors}
 
     def enter_room(self, door_f):
-        door_path = os.path.join(GAME_DIR, self.player['room_path'], "doors", door_f)
-        print(f"DEBUG: Checking {door_path}")
-        mobs_dir = os.path.join(GAME_DIR, self.player['room_path'], "mobs")
-        active = os.listdir(mobs_dir) if os.path.exists(mobs_dir) else []
-        door_path = os.path.join(GAME_DIR, self.player['room_path'], "doors", door_f)
-        if os.path.exists(door_path):
-            with open(door_path, "r") as f: d_data = f.read()
-            if "LOCKED: True" in d_data:
-                if self.player['keys'] > 0: self.player['keys'] -= 1; print("Unlocked.")
-                else: print("LOCKED."); sys.exit(1)
+        room = self.player['room_path']
+        self.say(f"DEBUG: Checking {os.path.join(self.root, room, 'doors', door_f)}")
+        active = self.world.list(room, "mobs")
+        door = self.world.read(room, "doors", door_f) if self.world.exists(room, "doors", door_f) else None
+        res = {"ok": False, "intercepted": 0}
+        if door and door['locked']:
+            if self.player['keys'] > 0: self.player['keys'] -= 1; self.say("Unlocked.")
+            else: self.say("LOCKED."); res['error'] = "locked"; return res
         if active:
-            if random.random() < 0.4:
-                with open(os.path.join(mobs_dir, active[0]), "r") as f: mob = json.load(f)
-                self.player['hp'] -= mob['atk']; print(f"Intercepted by {mob['name']}! Took {mob['atk']} DMG.")
-                if self.player['hp'] <= 0: self.terminate()
-        if not os.path.exists(door_path): return
-        with open(door_path, "r") as f: dt = f.readlines()[0].split(": ")[1].strip()
-        self.player['path_history'].append(self.player['room_path'])
-        self.player['room_path'] = f"room_{hashlib.md5((self.player['room_path']+door_f).encode()).hexdigest()[:6]}"
-        self.player['depth'] += 1; self.generate_room(self.player['room_path'], dt); self.save_player(self.player)
-        print(f"{Colors.BOLD}{Colors.PURPLE}Depth {self.player['depth']} reached.{Colors.END}")
+            if self.roll("intercept").random() < 0.4:
+                mob = self.world.read(room, "mobs", active[0])
+                self.player['hp'] -= mob['atk']; self.say(f"Intercepted by {mob['name']}! Took {mob['atk']} DMG.")
+                res['intercepted'] = mob['atk']
+                if self.player['hp'] <= 0: self.terminate(); res['outcome'] = "terminated"; return res
+        if not door: res['error'] = "missing"; return res
+        dt = door['leads_to']
+        hist = self.player['path_history']; hist.append(room)
+        if len(hist) > HISTORY_LIMIT: del hist[:len(hist) - HISTORY_LIMIT] # Ring: --back reaches the last HISTORY_LIMIT sectors
+        self.player['room_path'] = room_name(room, door_f)
+        self.player['depth'] += 1; self.generate_room(self.player['room_path'], dt); self.save_player(self.player, checkpoint=True)
+        self.say(f"{Colors.BOLD}{Colors.PURPLE}Depth {self.player['depth']} reached.{Colors.END}")
+        self.emit("room", room=self.player['room_path'], depth=self.player['depth'], door_type=dt)
+        res.update(ok=True, room=self.player['room_path'], depth=self.player['depth'], door_type=dt)
+        return res
 
     def backtrack(self):
-        if not self.player['path_history']: return
+        if not self.player['path_history']: return {"ok": False, "error": "no_history"}
         p = self.player['path_history'].pop(); self.player['depth'] = max(0, self.player['depth'] - 1)
-        self.player['room_path'] = p; self.generate_room(p, is_backtrack=True); self.save_player(self.player)
+        self.player['room_path'] = p; self.generate_room(p, is_backtrack=True); self.save_player(self.player, checkpoint=True)
+        self.emit("room", room=p, depth=self.player['depth'], backtrack=True)
+        return {"ok": True, "room": p, "depth": self.player['depth']}
+
+    def panic(self):
+        if self.player['xp'] >= 500:
+            self.player['xp'] -= 500; self.player['room_path'] = "start"; self.player['depth'] = 0
+            self.player['path_history'] = []; self.generate_room("start")
+            self.say(">> SYSTEM PANIC: Emergency exit to Start Sector initiated."); self.save_player(self.player, checkpoint=True)
+            self.emit("room", room="start", depth=0)
+            return {"ok": True, "room": "start", "depth": 0}
+        self.say("Need 500 XP to Panic.")
+        return {"ok": False, "error": "xp"}
+
+    def overclock(self):
+        if not self.combat: self.say("No combat active."); return {"ok": False, "error": "no_combat"}
+        if self.player['xp'] >= 2000:
+            self.player['xp'] -= 2000
+            c = self.combat; c['lock_turns'] = 10; c['mob_atk'] = 0 # Full stun
+            self.save_combat()
+            self.say(">> SYSTEM OVERCLOCK: Sacrificing XP to freeze enemy core. (Stunned for 10 turns)"); self.save_player(self.player)
+            return {"ok": True}
+        self.say("Need 2000 XP to Overclock.")
+        return {"ok": False, "error": "xp"}
+
+    def purge(self):
+        if not self.combat: self.say("No combat active."); return {"ok": False, "error": "no_combat"}
+        c = self.combat
+        if c['mob_hp'] < (c['mob_max_hp'] * 0.25):
+            self.say(f">> ROOT PURGE: Executing total system wipe on {c['mob_name']}...")
+            c['mob_hp'] = 0; self.player['xp'] = 0
+            return self.combat_turn("MOV") # Trigger victory logic
+        self.say("Enemy HP too high for Purge (Need < 25%).")
+        return {"ok": False, "error": "hp"}
 
     def sell_key(self):
         if self.player['keys'] > 0:
             self.player['keys'] -= 1; self.player['xp'] += 50
-            print(f"{Colors.YELLOW}Key -> 50 XP.{Colors.END}"); self.save_player(self.player)
+            self.say(f"{Colors.YELLOW}Key -> 50 XP.{Colors.END}"); self.save_player(self.player)
+            return {"ok": True}
+        return {"ok": False, "error": "keys"}
 
     def buy_key(self):
         if self.player['xp'] >= 100:
             self.player['xp'] -= 100; self.player['keys'] += 1
-            print(f"{Colors.YELLOW}100 XP -> Key.{Colors.END}"); self.save_player(self.player)
-        else: print(f"{Colors.RED}Need 100 XP.{Colors.END}")
+            self.say(f"{Colors.YELLOW}100 XP -> Key.{Colors.END}"); self.save_player(self.player)
+            return {"ok": True}
+        self.say(f"{Colors.RED}Need 100 XP.{Colors.END}")
+        return {"ok": False, "error": "xp"}
 
     def wipe_traces(self):
-        print(f"{Colors.CYAN}>> INITIALIZING FILESYSTEM PURGE...{Colors.END}")
-        for item in os.listdir(GAME_DIR):
-            item_path = os.path.join(GAME_DIR, item)
-            # Remove all room directories and the 'start' directory contents
-            if os.path.isdir(item_path) and (item.startswith("room_") or item == "start"):
-                import shutil
-                if item == "start":
-                    # Keep the directory but clear contents (mobs/items/doors)
-                    for sub in os.listdir(item_path):
-                        sub_p = os.path.join(item_path, sub)
-                        if os.path.isdir(sub_p): shutil.rmtree(sub_p)
-                        else: os.remove(sub_p)
-                else:
-                    shutil.rmtree(item_path)
+        self.say(f"{Colors.CYAN}>> INITIALIZING FILESYSTEM PURGE...{Colors.END}")
+        self.world.wipe()
         
         # Remove volatile state files
-        for f in [PLAYER_FILE, COMBAT_FILE, BOSS_FILE]:
-            if os.path.exists(f): os.remove(f)
-        print(f"{Colors.CYAN}>> FILESYSTEM PURGED. NO TRACES REMAIN.{Colors.END}")
+        if self.persist:
+            self.store.delete("player"); self.store.delete("combat")
+            if os.path.exists(self.boss_file): os.remove(self.boss_file)
+        self.say(f"{Colors.CYAN}>> FILESYSTEM PURGED. NO TRACES REMAIN.{Colors.END}")
+
+    def end_run(self, outcome):
+        self.emit(outcome, seed=self.seed, depth=self.player.get('depth'))
+        self.session['events'].append({"event": outcome, "seed": self.seed, "depth": self.player.get('depth'), "time": time.time()})
+        self.save_session()
+        # Mirror what a fresh process would load after wipe_traces
+        self.over = outcome
+        self.combat = None
+        self.player = {"seed": WORLD_SEED}; self.seed = WORLD_SEED
 
     def terminate(self):
-        print(f"{Colors.RED}{Colors.BOLD}RUN TERMINATED.{Colors.END}"); self.globals['total_xp'] += self.player['xp']; self.save_global()
-        self.wipe_traces()
-        sys.exit()
+        self.say(f"{Colors.RED}{Colors.BOLD}RUN TERMINATED.{Colors.END}"); self.globals['total_xp'] += self.player['xp']; self.save_global()
+        self.wipe_traces(); self.end_run("terminated")
 
     def upgrade(self, stat):
         cost = 200
         if self.globals['total_xp'] >= cost:
             self.globals['total_xp'] -= cost
-            if stat == "hp": self.globals['base_hp'] += 10; print(f"{Colors.GREEN}Base HP Up!{Colors.END}")
-            elif stat == "atk": self.globals['base_atk'] += 2; print(f"{Colors.YELLOW}Base ATK Up!{Colors.END}")
-            elif stat == "dodge": self.globals['base_dodge'] = min(75, self.globals['base_dodge'] + 1); print(f"{Colors.CYAN}Base Dodge Up!{Colors.END}")
-            elif stat == "crit": self.globals['base_crit'] += 1; print(f"{Colors.PURPLE}Base Crit Up!{Colors.END}")
+            if stat == "hp": self.globals['base_hp'] += 10; self.say(f"{Colors.GREEN}Base HP Up!{Colors.END}")
+            elif stat == "atk": self.globals['base_atk'] += 2; self.say(f"{Colors.YELLOW}Base ATK Up!{Colors.END}")
+            elif stat == "dodge": self.globals['base_dodge'] = min(75, self.globals['base_dodge'] + 1); self.say(f"{Colors.CYAN}Base Dodge Up!{Colors.END}")
+            elif stat == "crit": self.globals['base_crit'] += 1; self.say(f"{Colors.PURPLE}Base Crit Up!{Colors.END}")
             self.save_global()
-        else: print(f"{Colors.RED}Need 200 Global XP.{Colors.END}")
+            return {"ok": True, "stat": stat}
+        self.say(f"{Colors.RED}Need 200 Global XP.{Colors.END}")
+        return {"ok": False, "error": "xp"}
 
     def show_status(self):
         p = self.player
         if 'depth' not in p:
-            print(f"\n{Colors.BOLD}--- NO ACTIVE RUN ---{Colors.END}")
-            print(f"GLOBAL XP: {Colors.YELLOW}{self.globals['total_xp']}{Colors.END} | BASE: {self.globals['base_hp']}HP/{self.globals['base_atk']}ATK/{self.globals['base_dodge']}%DODGE")
-            print(f"-------------------\n")
-            return
+            self.say(f"\n{Colors.BOLD}--- NO ACTIVE RUN ---{Colors.END}")
+            self.say(f"GLOBAL XP: {Colors.YELLOW}{self.globals['total_xp']}{Colors.END} | BASE: {self.globals['base_hp']}HP/{self.globals['base_atk']}ATK/{self.globals['base_dodge']}%DODGE")
+            self.say(f"-------------------\n")
+            return {"ok": True, "active": False}
 
-        print(f"\n{Colors.BOLD}--- RUN DEPTH {p['depth']} --- XP: {Colors.YELLOW}{p['xp']}{Colors.END} | LVL: {Colors.CYAN}{p['lvl']}{Colors.END} | CLASS: {Colors.PURPLE}{p['class']}{Colors.END}")
-        print(f"{Colors.BOLD}RUN SEED: {self.seed}{Colors.END}")
+        self.say(f"\n{Colors.BOLD}--- RUN DEPTH {p['depth']} --- XP: {Colors.YELLOW}{p['xp']}{Colors.END} | LVL: {Colors.CYAN}{p['lvl']}{Colors.END} | CLASS: {Colors.PURPLE}{p['class']}{Colors.END}")
+        self.say(f"{Colors.BOLD}RUN SEED: {self.seed}{Colors.END}")
         
         hp_color = Colors.GREEN if p['hp'] > p['max_hp'] * 0.5 else Colors.RED
-        print(f"HP: {hp_color}{p['hp']}/{p['max_hp']}{Colors.END} | ATK: {Colors.YELLOW}{p['atk']}{Colors.END} | DR: {p['dr']} | DODGE: {p['dodge']}% | CRIT: {p['crit']}%")
+        self.say(f"HP: {hp_color}{p['hp']}/{p['max_hp']}{Colors.END} | ATK: {Colors.YELLOW}{p['atk']}{Colors.END} | DR: {p['dr']} | DODGE: {p['dodge']}% | CRIT: {p['crit']}%")
         
-        print(f"MEMORY: {Colors.BOLD}{p['mem_used']}B Used{Colors.END} | {p['fragmentation']}B Holes | {p['mem_capacity']}B Cap")
-        print(f"BUFFER: {[i['name'] for i in p['inventory']]}")
-        print(f"GLOBAL XP: {Colors.YELLOW}{self.globals['total_xp']}{Colors.END} | BASE: {self.globals['base_hp']}HP/{self.globals['base_atk']}ATK")
-        print(f"-------------------\n")
+        self.say(f"MEMORY: {Colors.BOLD}{p['mem_used']}B Used{Colors.END} | {p['fragmentation']}B Holes | {p['mem_capacity']}B Cap")
+        self.say(f"BUFFER: {[i['name'] for i in p['inventory']]}")
+        self.say(f"GLOBAL XP: {Colors.YELLOW}{self.globals['total_xp']}{Colors.END} | BASE: {self.globals['base_hp']}HP/{self.globals['base_atk']}ATK")
+        self.say(f"-------------------\n")
+        return {"ok": True, "active": True}
+
+    def materialize(self):
+        if not hasattr(self.world, "materialize"): self.say("Sectors are already on disk."); return {"ok": True}
+        path = self.world.materialize()
+        if path: self.say(f">> MATERIALIZED: {os.path.join(self.root, path)}")
+        return {"ok": path is not None, "room": path}
+
+    def show_metrics(self, arg=None):
+        # --metrics [reset]: latency percentiles per command and per timed method, plus I/O totals
+        # Metrics off in this process (e.g. a plain CLI call): read what instrumented ones recorded
+        m = self.metrics or Metrics((metrics_file(self.root) or metrics_file(self.root, True)) if self.persist else None)
+        if arg == "reset":
+            m.records.clear()
+            if m.path and os.path.exists(m.path): os.remove(m.path)
+            self.say(">> METRICS RESET."); return {"ok": True}
+        res = {"ok": True, **m.summary()}
+        self.say(f">> METRICS: {res['records']} commands ({m.path or 'in memory'})")
+        for title, table in (("COMMAND", res['commands']), ("METHOD", res['methods'])):
+            if not table: continue
+            self.say(f"{title:14} {'N':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+            for k, h in table.items(): self.say(f"{k:14} {h['n']:6} {h['p50']:9.3f} {h['p95']:9.3f} {h['p99']:9.3f} {h['max']:9.3f}")
+        io = res['io']
+        self.say(f"I/O: {io['opens']} opens | {io['bytes_written']} bytes written | {io['dirs_created']} dirs created")
+        return res
+
+    def init_run(self, seed=None):
+        self.reset_run(seed); self.generate_room("start"); self.say("Init.")
+        self.emit("run_start", seed=self.seed)
+        self.session['events'].append({"event": "init", "seed": self.seed, "time": time.time()})
+        self.save_session()
+        return {"ok": True, "seed": self.seed}
+
+    def log_action(self, argv, rng, globals=None):
+        # action_log.jsonl: one line per state-changing command with the RNG counters it started from
+        if not self.persist: return
+        rec = {"seed": self.seed, "argv": argv, "rng": rng}
+        if globals is not None: rec['globals'] = globals
+        if 'depth' in self.player: rec['depth'] = self.player['depth']; rec['hp'] = self.player['hp']
+        if self.over: rec['over'] = self.over
+        t0 = time.perf_counter(); sync = should_sync(self.durability, globals is not None); mode = "a"
+        if argv[0] == "--init" and os.path.exists(self.action_file):
+            # One run per action_log.jsonl: earlier runs move to the append-only archive, so replaying the live run
+            # reads just that run. Archive first: a crash in between can only duplicate a run, never lose one.
+            with open(self.action_file, "r") as src, open(self.action_archive, "a") as dst:
+                nbytes = dst.write(src.read()); dst.flush()
+                if sync: os.fsync(dst.fileno())
+            count_write(t0, nbytes); t0 = time.perf_counter(); mode = "w"
+        with open(self.action_file, mode) as f:
+            nbytes = f.write(json.dumps(rec) + "\n"); f.flush()
+            if sync: os.fsync(f.fileno())
+        count_write(t0, nbytes)
+
+    def replay(self, log_path, seed=None, step=None, trace=False):
+        # Re-run one logged run (the last one by default) in memory: no printing, no state files.
+        # Runs not in log_path are looked up in its archive (see log_action).
+        # Returns the engine at `step` actions in (all of them by default) plus the first RNG divergence, if any.
+        found = find_run(log_path, seed) or find_run(action_archive(log_path), seed)
+        if not found: self.say(f"No run {seed or ''} in {log_path}."); return {"ok": False, "error": "missing"}
+        run, actions = found
+        actions = actions[:step] if step is not None else actions
+        eng = DelveEngine(verbose=False, world=MemoryWorld(), persist=False, globals=dict(run['globals']))
+        eng.execute(run['argv']); diverged = None
+        for i, r in enumerate(actions, 1):
+            if diverged is None and eng.player.get('rng', {}) != r['rng']: diverged = i
+            eng.execute(r['argv'])
+            if trace and 'depth' in eng.player: self.say(f"[{i}] {' '.join(r['argv'])} -> DEPTH {eng.player['depth']} | HP {eng.player['hp']}")
+            elif trace: self.say(f"[{i}] {' '.join(r['argv'])} -> {eng.over or 'no run'}")
+        self.say(f">> REPLAYED {run['seed']}: {len(actions)} actions" + (f" (RNG diverged at step {diverged})" if diverged else ""))
+        return {"ok": True, "seed": run['seed'], "steps": len(actions), "diverged": diverged, "over": eng.over,
+                "player": eng.player, "combat": eng.combat, "engine": eng}
+
+    def execute_json(self, argv, policy=None):
+        # --json: one machine-readable result instead of colored text. The player delta holds only the keys that
+        # changed, followed by the resulting snapshots, so callers never re-read player_stats.json.
+        before = json.loads(json.dumps(self.player)); verbose = self.verbose; self.verbose = False
+        try: res = self.execute(argv, policy=policy)
+        finally: self.verbose = verbose
+        after = self.player; active = 'depth' in after
+        out = {"ok": res.get('ok', False), "cmd": argv[0] if argv else "--status", "result": res, "events": self.events,
+               "delta": {k: v for k, v in after.items() if before.get(k) != v} if active else {},
+               "player": after if active else None, "combat": self.combat}
+        for k in ("dmg_dealt", "dmg_taken", "over", "exit"):
+            if k in res: out[k] = res[k]
+        return out
+
+    def execute(self, argv, policy=None):
+        # Single entry point shared by the CLI and in-process callers: argv without the program name.
+        # policy: a callable fight policy for --fight (in-process only; see resolve_combat), instead of --policy
+        if "--json" in argv: return self.execute_json([a for a in argv if a != "--json"], policy)
+        self.lines = []; self.events = []; self.over = None
+        if not argv: return self.show_status()
+        if argv[0] == "--replay":
+            step, argv = pop_flag(argv, "--step"); seed, argv = pop_flag(argv, "--seed")
+            if len(argv) < 2: self.say("--replay requires a log file."); return {"ok": False, "error": "usage", "exit": 2}
+            res = self.replay(argv[1], seed, int(step) if step else None, trace="--trace" in argv)
+            if res['ok']:
+                eng = res.pop('engine'); eng.show_status()
+                for line in eng.lines: self.say(line)
+            return res
+        logged = list(argv); rng = dict(self.player.get('rng', {}))
+        ops, argv = pop_flag(argv, "--policy")
+        seed, argv = pop_flag(argv, "--seed")
+        if not argv: self.say("Missing command (only --seed/--policy given)."); return {"ok": False, "error": "usage", "exit": 2}
+        cmd = argv[0]; arg = argv[1] if len(argv) > 1 else None
+        if cmd in ARG_COMMANDS and arg is None:
+            self.say(f"{cmd} requires an argument."); return {"ok": False, "error": "usage", "exit": 2}
+        if cmd == "--init": res = self.init_run(seed)
+        elif cmd == "--enter":
+            res = self.enter_room(arg)
+            if res.get('error') == "locked": res['exit'] = 1
+        elif cmd == "--attack": res = self.attack_init(arg)
+        elif cmd == "--op": res = self.combat_turn(arg)
+        elif cmd == "--fight":
+            res = self.resolve_combat(policy or ops or "MOV", arg)
+            # Logged as the opcodes actually played, so a callable policy replays exactly
+            if res['ok'] and res['turns']: logged = ["--fight"] + ([arg] if arg else []) + ["--policy", ",".join(t['opcode'] for t in res['turns'])]
+            if res['ok']: self.say(f">> FIGHT RESOLVED: {res['mob']} -> {res['outcome'].upper()} in {len(res['turns'])} turns ({res['dmg_dealt']} dealt / {res['dmg_taken']} taken)")
+        elif cmd == "--loot": res = self.loot(arg)
+        elif cmd == "--use": res = self.use_item(arg)
+        elif cmd == "--defrag": res = self.defrag()
+        elif cmd == "--skill" and arg == "symlink": res = self.symlink()
+        elif cmd == "--upgrade": res = self.upgrade(arg)
+        elif cmd == "--status": res = self.show_status()
+        elif cmd == "--panic": res = self.panic()
+        elif cmd == "--overclock": res = self.overclock()
+        elif cmd == "--purge-cmd": res = self.purge()
+        elif cmd == "--sell-key": res = self.sell_key()
+        elif cmd == "--buy-key": res = self.buy_key()
+        elif cmd == "--back": res = self.backtrack()
+        elif cmd == "--materialize": res = self.materialize()
+        elif cmd == "--metrics": res = self.show_metrics(arg)
+        elif cmd == "--cache-stats":
+            res = {"ok": True, **ROOM_CACHE.stats()}
+            self.say(f">> ROOM CACHE: {res['entries']}/{res['size']} specs | {res['hits']} hits / {res['misses']} misses ({res['hit_rate'] * 100:.1f}%)")
+        else: res = {"ok": False, "error": "unknown"}
+        if self.over: res['over'] = self.over
+        if cmd not in READ_ONLY_COMMANDS and res.get('error') not in ("unknown", "usage"):
+            if cmd == "--init": self.log_action(["--init", "--seed", self.seed], {}, dict(self.globals)) # --init never changes globals
+            else: self.log_action(logged, rng)
+        return res
+
+READ_ONLY_COMMANDS = {"--status", "--materialize", "--cache-stats", "--metrics"}
+ARG_COMMANDS = {"--enter", "--attack", "--op", "--loot", "--use", "--skill", "--upgrade"}
+
+def state_signature(engine):
+    sig = []
+    for f in engine.store.paths() + [engine.global_file]:
+        try: st = os.stat(f); sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError: sig.append(None)
+    return sig
+
+def engine_settings(engine):
+    # What a daemon was started with, in --world/--state/--fsync terms, so clients can check they match
+    w = engine.world
+    world = "lazy" if isinstance(w, LazyWorld) else "memory" if isinstance(w, MemoryWorld) else "scratch" if getattr(w, "scratch", False) else "files"
+    return {"root": engine.root, "world": world, "state": "journal" if isinstance(engine.store, JournalStore) else "json", "fsync": engine.durability}
+
+def settings_mismatch(engine, root=None, config=None):
+    # Why this daemon can't honour a request for root/config (None when it can)
+    have = engine_settings(engine)
+    if root and os.path.abspath(root) != have['root']: return f"Daemon serves {have['root']}, not {os.path.abspath(root)}."
+    bad = [f"--{k} {v} (daemon: {have[k]})" for k, v in (config or {}).items() if v is not None and v != have[k]]
+    return f"Daemon can't honour {', '.join(bad)}." if bad else None
+
+def serve(root=None, sock_path=None, world=None, state=None, durability=None):
+    # Long-lived engine: one DelveEngine in memory, JSON-lines requests over a Unix socket.
+    # Request: {"argv": ["--op", "MOV"], "root": ..., "config": {"world": ...}}  Response: {"lines": [...], "events": [...], "result": {...}}
+    # root/config are optional; a request for another root or other --world/--state/--fsync settings is refused.
+    # {"watch": true} turns the connection into a stream of every event the engine emits, one JSON line each.
+    import socket, socketserver, threading, queue
+    sock_path = sock_path or socket_path(root)
+    if os.path.exists(sock_path):
+        if daemon_request(["--ping"], sock_path) is not None: print(f"Daemon already running on {sock_path}."); return
+        os.remove(sock_path) # Stale socket from a killed daemon
+    watchers = []
+    def make_engine():
+        eng = DelveEngine(verbose=False, root=root, world=world, state=state, durability=durability)
+        eng.on(lambda ev: [q.put(ev) for q in list(watchers)])
+        return eng
+    current = {"engine": make_engine()}
+    current['sig'] = state_signature(current['engine'])
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                try: msg = json.loads(raw)
+                except ValueError: msg = None
+                if isinstance(msg, dict) and msg.get("watch"): return self.watch()
+                try: argv = msg['argv']
+                except (KeyError, TypeError): self.reply({"lines": [], "result": {"ok": False, "error": "bad_request", "exit": 2}}); continue
+                events = []
+                with lock:
+                    why = argv[:1] not in (["--ping"], ["--shutdown"]) and settings_mismatch(current['engine'], msg.get('root'), msg.get('config'))
+                    if why: res = {"ok": False, "error": "daemon_mismatch", "exit": 2}; lines = [why, "Stop it with --shutdown or bypass it with LABYRINTH_NO_DAEMON=1."]
+                    elif argv[:1] == ["--ping"]: res = dict(engine_settings(current['engine']), ok=True, pid=os.getpid()); lines = []
+                    elif argv[:1] == ["--shutdown"]: res = {"ok": True}; lines = [">> DAEMON SHUTDOWN."]
+                    else:
+                        # Another tool rewrote the state files behind our back: reload before acting
+                        if state_signature(current['engine']) != current['sig']: current['engine'] = make_engine()
+                        eng = current['engine']
+                        try: res = eng.execute(argv); lines = eng.lines; events = eng.events
+                        except Exception as e:
+                            # Reply instead of dropping the connection (the client would re-run the command cold),
+                            # and reload from disk: the engine may hold a half-applied command
+                            import traceback; traceback.print_exc()
+                            res = {"ok": False, "error": "internal", "message": f"{type(e).__name__}: {e}", "exit": 1}
+                            lines = [f">> DAEMON ERROR: {res['message']}"]; current['engine'] = eng = make_engine()
+                        current['sig'] = state_signature(eng)
+                self.reply({"lines": lines, "events": events, "result": res})
+                if argv[:1] == ["--shutdown"]:
+                    for q in list(watchers): q.put(None)
+                    threading.Thread(target=server.shutdown).start(); return
+
+        def watch(self):
+            q = queue.Queue(); watchers.append(q)
+            self.reply({"event": "watching", "pid": os.getpid()})
+            try:
+                while True:
+                    ev = q.get()
+                    if ev is None: return
+                    self.reply(ev)
+            except OSError: pass # Watcher went away
+            finally: watchers.remove(q)
+
+        def reply(self, msg):
+            self.wfile.write((json.dumps(msg) + "\n").encode()); self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    server = Server(sock_path, Handler)
+    print(f">> ENGINE DAEMON ONLINE: {sock_path} (pid {os.getpid()})")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally:
+        server.server_close()
+        if os.path.exists(sock_path): os.remove(sock_path)
+
+def daemon_request(argv, sock_path=None, root=None, config=None):
+    # Returns the daemon's response dict, or None when no daemon is listening. A daemon that accepted the request
+    # and then went away gets an error response, never None: the command may have run, so it must not run again.
+    # root/config (world/state/fsync) let the daemon refuse commands it would run against the wrong settings.
+    sock_path = sock_path or socket_path(root)
+    if not os.path.exists(sock_path): return None
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try: s.connect(sock_path)
+        except OSError: return None
+        try:
+            s.sendall((json.dumps({"argv": argv, "root": root and game_root(root), "config": config}) + "\n").encode())
+            with s.makefile("rb") as f: raw = f.readline()
+        except OSError: raw = b""
+    if raw: return json.loads(raw)
+    return {"lines": [">> DAEMON DROPPED THE CONNECTION; the command may or may not have run."],
+            "events": [], "result": {"ok": False, "error": "daemon_dropped", "exit": 1}}
+
+def watch_events(sock_path=None):
+    # Blocking generator over the daemon's event stream; ends when the daemon shuts down
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(sock_path or socket_path())
+        s.sendall(b'{"watch": true}\n')
+        with s.makefile("rb") as f:
+            for raw in f:
+                ev = json.loads(raw)
+                if ev['event'] != "watching": yield ev
+
+def action_archive(log_path):
+    # action_log.jsonl -> action_log.archive.jsonl: where --init moves the previous runs
+    return os.path.splitext(log_path)[0] + ".archive.jsonl"
+
+def find_run(log_path, seed=None):
+    # (init record, action records) of the last run in log_path (with that seed), or None.
+    # Streams the file and only json-loads the lines of a matching run, so a long archive stays cheap to search.
+    if not os.path.exists(log_path): return None
+    run = None; actions = []; take = False
+    with open(log_path, "r") as f:
+        for line in f:
+            if '"argv": ["--init"' in line:
+                rec = json.loads(line); take = seed is None or rec['seed'] == seed
+                if take: run, actions = rec, []
+            elif take and line.strip(): actions.append(json.loads(line))
+    return (run, actions) if run else None
+
+def report_timing(phases):
+    # --timing: one line on stderr so --json output stays parseable
+    parts = " | ".join(f"{name} {ms:.2f}ms" for name, ms in phases)
+    print(f">> TIMING: {parts} | total {sum(ms for _, ms in phases):.2f}ms", file=sys.stderr)
 
 if __name__ == "__main__":
-    engine = DelveEngine()
-    if len(sys.argv) < 2: engine.show_status(); sys.exit()
-    cmd = sys.argv[1]
-    if cmd == "--init": engine.reset_run(); engine.generate_room("start"); print("Init.")
-    elif cmd == "--enter": engine.enter_room(sys.argv[2])
-    elif cmd == "--attack": engine.attack_init(sys.argv[2])
-    elif cmd == "--op": engine.combat_turn(sys.argv[2])
-    elif cmd == "--loot": engine.loot(sys.argv[2])
-    elif cmd == "--use": engine.use_item(sys.argv[2])
-    elif cmd == "--defrag": engine.defrag()
-    elif cmd == "--skill" and sys.argv[2] == "symlink": engine.symlink()
-    elif cmd == "--upgrade": engine.upgrade(sys.argv[2])
-    elif cmd == "--status": engine.show_status()
-    elif cmd == "--panic":
-        if engine.player['xp'] >= 500:
-            engine.player['xp'] -= 500; engine.player['room_path'] = "start"; engine.player['depth'] = 0
-            engine.player['path_history'] = []; engine.generate_room("start")
-            print(">> SYSTEM PANIC: Emergency exit to Start Sector initiated."); engine.save_player(engine.player)
-        else: print("Need 500 XP to Panic.")
-    elif cmd == "--overclock":
-        if os.path.exists(COMBAT_FILE):
-            if engine.player['xp'] >= 2000:
-                engine.player['xp'] -= 2000
-                with open(COMBAT_FILE, "r") as f: c = json.load(f)
-                c['lock_turns'] = 10; c['mob_atk'] = 0 # Full stun
-                with open(COMBAT_FILE, "w") as f: json.dump(c, f, indent=4)
-                print(">> SYSTEM OVERCLOCK: Sacrificing XP to freeze enemy core. (Stunned for 10 turns)"); engine.save_player(engine.player)
-            else: print("Need 2000 XP to Overclock.")
-        else: print("No combat active.")
-    elif cmd == "--purge-cmd":
-        if os.path.exists(COMBAT_FILE):
-            with open(COMBAT_FILE, "r") as f: c = json.load(f)
-            if c['mob_hp'] < (c['mob_max_hp'] * 0.25):
-                print(f">> ROOT PURGE: Executing total system wipe on {c['mob_name']}...")
-                c['mob_hp'] = 0; engine.player['xp'] = 0
-                with open(COMBAT_FILE, "w") as f: json.dump(c, f, indent=4)
-                engine.combat_turn("MOV") # Trigger victory logic
-            else: print("Enemy HP too high for Purge (Need < 25%).")
-        else: print("No combat active.")
-    elif cmd == "--sell-key": engine.sell_key()
-    elif cmd == "--buy-key": engine.buy_key()
-    elif cmd == "--back": engine.backtrack()
+    import_ms = (time.perf_counter() - IMPORT_START) * 1000
+    timing = "--timing" in sys.argv; t0 = time.perf_counter()
+    root, argv = pop_flag([a for a in sys.argv[1:] if a != "--timing"], "--root")
+    world, argv = pop_flag(argv, "--world")
+    state, argv = pop_flag(argv, "--state")
+    durability, argv = pop_flag(argv, "--fsync")
+    if argv[:1] == ["--serve"]: serve(root, world=world, state=state, durability=durability); sys.exit()
+    if argv[:1] == ["--watch"]:
+        try:
+            for ev in watch_events(socket_path(root)): print(json.dumps(ev), flush=True)
+        except OSError: print("No daemon running."); sys.exit(1)
+        except KeyboardInterrupt: pass
+        sys.exit()
+    config = {"world": world, "state": state, "fsync": durability}
+    resp = None if os.environ.get("LABYRINTH_NO_DAEMON") else daemon_request(argv, socket_path(root), game_root(root), config)
+    if resp is not None:
+        res = resp['result']
+        if "--json" in argv: print(json.dumps(res, separators=(",", ":")))
+        else:
+            for line in resp['lines']: print(line)
+        if timing: report_timing([("import", import_ms), ("daemon", (time.perf_counter() - t0) * 1000)])
+    else:
+        if argv[:1] == ["--shutdown"]: print("No daemon running."); sys.exit(1)
+        engine = DelveEngine(root=root, world=world, state=state, durability=durability)
+        t1 = time.perf_counter()
+        res = engine.execute(argv)
+        t2 = time.perf_counter(); save_ms = IO_STATS['save_seconds'] * 1000
+        if "--json" in argv: print(json.dumps(res, separators=(",", ":")))
+        if timing: report_timing([("import", import_ms), ("load", (t1 - t0) * 1000),
+                                  ("execute", (t2 - t1) * 1000 - save_ms), ("save", save_ms)])
+    sys.exit(res.get("exit", 0))
@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from engine import DelveEngine, MemoryWorld, MOBS, SPECIAL_MOBS, RARITIES, game_root, pop_flag
+
+MOV, NOP, ADD, XOR, LOCK, PURGE = range(6)
+OPCODES = {"MOV": MOV, "NOP": NOP, "ADD": ADD, "XOR": XOR, "LOCK": LOCK, "PURGE": PURGE}
+
+def boss_policy(s, turn):
+    # trial_runner's Key Devourer script: PURGE under 25%, keep LOCK up while keys last, else MOV
+    op = np.where((s['lock'] <= 1) & (s['keys'] > 0), LOCK, MOV)
+    return np.where(s['mob_hp'] < s['mob_max_hp'] * 0.25, PURGE, op)
+
+def make_policy(spec):
+    # "boss" or a cycled opcode list like "LOCK,MOV,MOV"
+    if spec == "boss": return boss_policy
+    ops = [OPCODES[op.strip().upper()] for op in spec.split(",") if op.strip()] or [MOV]
+    return lambda s, turn: np.full(len(s['mob_hp']), ops[turn % len(ops)])
+
+def estimate(player, mob, policy="MOV", n=100000, max_turns=300, seed=None):
+    # n independent fights of combat_turn, one array slot each; every roll is drawn for the whole batch per turn
+    rng = np.random.default_rng(seed)
+    pick = make_policy(policy) if isinstance(policy, str) else policy
+    traits = mob.get('traits', [])
+    devourer = "Key Devourer" in mob['name']
+    tracking = 40 if "unavoidable" in traits else 15 if "true_dmg" in traits else 0
+    dr_pen = 0.25 if "true_dmg" in traits else 1.0
+    s = {"mob_hp": np.full(n, mob['hp'], dtype=np.int64), "mob_max_hp": mob['hp'], "mob_atk": np.full(n, mob['atk'], dtype=np.int64),
+         "hp": np.full(n, player['hp'], dtype=np.int64), "atk": np.full(n, player['atk'], dtype=np.int64),
+         "keys": np.full(n, player['keys'], dtype=np.int64), "mult": np.ones(n), "lock": np.zeros(n, dtype=np.int64),
+         "temp_dr": np.zeros(n, dtype=np.int64), "keys_fed": np.zeros(n, dtype=np.int64),
+         "evasion_penalty": np.zeros(n, dtype=np.int64), "tracking_bonus": np.zeros(n, dtype=np.int64)}
+    live = np.ones(n, dtype=bool); won = np.zeros(n, dtype=bool); turns = np.zeros(n, dtype=np.int64)
+
+    for turn in range(max_turns):
+        if not live.any(): break
+        op = pick(s, turn); turns[live] += 1
+        mov = live & (op == MOV); nop = live & (op == NOP); add = live & (op == ADD); xor = live & (op == XOR)
+        purge = live & (op == PURGE) & (s['mob_hp'] < s['mob_max_hp'] * 0.25)
+        lock = live & (op == LOCK) & (s['keys'] > 0)
+
+        # Player turn
+        s['mob_hp'][purge] = 0; mov |= purge
+        p_dmg = np.where(mov, np.floor(s['atk'] * s['mult']).astype(np.int64), 0)
+        p_dmg = np.where(mov & (rng.random(n) < player['crit'] / 100.0), p_dmg * 2, p_dmg)
+        s['mob_hp'] -= p_dmg; s['mult'][mov] = 1.0
+        s['mult'][nop] *= 2.0; s['atk'][add] += 4; s['temp_dr'][xor] = 10
+        s['keys'][lock] -= 1; s['lock'][lock] = 3
+        if devourer:
+            s['keys_fed'][lock] += 1
+            s['mob_hp'][lock] = np.minimum(s['mob_max_hp'], s['mob_hp'][lock] + 100); s['mob_atk'][lock] += 5
+            live &= ~(lock & (s['keys_fed'] > 30)) # Overload explosion ends the run
+            kf = s['keys_fed']
+            fb = np.select([kf > 20, kf > 15, kf > 8], [41, 60, 30], 10) # Fallout bands from combat_turn
+            emp = rng.random(n) < 0.25
+            dodge = np.where(emp, 0, player['dodge'] - kf)
+            hit_fb = lock & live & ~(rng.random(n) < dodge / 100.0)
+            s['hp'][hit_fb] -= fb[hit_fb]
+
+        win = live & (s['mob_hp'] <= 0)
+        won |= win; live &= ~win
+
+        # Mob turn
+        stunned = live & (s['lock'] > 0) if devourer else np.zeros(n, dtype=bool)
+        s['lock'][stunned] -= 1
+        attack = live & ~stunned
+        eff_dodge = np.maximum(0, player['dodge'] - s['evasion_penalty'] - s['tracking_bonus'] - tracking)
+        evade = attack & (rng.random(n) < eff_dodge / 100.0)
+        s['evasion_penalty'][evade] += 5; s['tracking_bonus'][evade] += 20
+        s['hp'][evade] -= np.maximum(1, np.trunc(s['mob_atk'][evade] * 0.10).astype(np.int64))
+        hit = attack & ~evade
+        s['tracking_bonus'][hit] = 0
+
+        variance = rng.uniform(0.85, 1.15, n)
+        dmg = np.maximum(1, np.trunc(s['mob_atk'] * variance - (player['dr'] + s['temp_dr']) * dr_pen).astype(np.int64))
+        throttled = hit & (s['lock'] > 0)
+        dmg = np.where(throttled, dmg // 2, dmg); s['lock'][throttled] -= 1
+        if "crit" in traits: dmg = np.where(rng.random(n) < 0.25, dmg * 2, dmg)
+        if "race_condition" in traits:
+            race = hit & (rng.random(n) < 0.3)
+            s['hp'][race] -= p_dmg[race]
+        s['hp'][hit] -= dmg[hit]
+        reflect = hit & xor
+        s['mob_hp'][reflect] -= dmg[reflect] // 4; s['temp_dr'][reflect] = 0
+
+        live &= s['hp'] > 0
+
+    lost = ~won & ~live
+    hp_loss = player['hp'] - s['hp']
+    kill_turns = turns[won]
+    pct = lambda q: float(np.percentile(kill_turns, q)) if len(kill_turns) else None
+    return {"fights": n, "win": float(won.mean()), "loss": float(lost.mean()), "unresolved": float(live.mean()),
+            "turns_to_kill": {"mean": float(kill_turns.mean()) if len(kill_turns) else None,
+                              "p10": pct(10), "p50": pct(50), "p90": pct(90),
+                              "histogram": {int(t): int(c) for t, c in zip(*np.unique(kill_turns, return_counts=True))}},
+            "hp_loss": {"mean": float(hp_loss.mean()), "mean_on_win": float(hp_loss[won].mean()) if won.any() else None},
+            "keys_used": float((player['keys'] - s['keys']).mean())}
+
+def resolve_mob(spec, depth, corruption, rarity, seed):
+    # Mob id (0xA0), or a name fragment matched against MOBS/SPECIAL_MOBS, scaled by get_scaled_mob
+    all_mobs = {**MOBS, **SPECIAL_MOBS}
+    try: mob_id = int(spec, 0)
+    except ValueError:
+        hits = [k for k, m in all_mobs.items() if spec.lower() in m['name'].lower()]
+        if not hits: sys.exit(f"Unknown mob: {spec}")
+        mob_id = hits[0]
+    eng = DelveEngine(verbose=False, world=MemoryWorld(), persist=False, globals={})
+    return eng.get_scaled_mob(mob_id, random.Random(seed), forced_rarity=rarity, depth=depth, corruption=corruption)
+
+def main():
+    root, argv = pop_flag(sys.argv[1:], "--root")
+    ap = argparse.ArgumentParser(description="Monte-Carlo combat outcome estimator")
+    ap.add_argument("--player", help="Player stat block JSON (default: <root>/player_stats.json)")
+    ap.add_argument("--mob", default="Key Devourer", help="Mob id (0xA0) or name fragment")
+    ap.add_argument("--depth", type=int, help="Scaling depth (default: the player's)")
+    ap.add_argument("--corruption", type=int, help="Scaling corruption (default: the player's)")
+    ap.add_argument("--rarity", choices=list(RARITIES), default="COMMON")
+    ap.add_argument("--policy", action="append", help="'boss' or a cycled opcode list like LOCK,MOV (repeatable)")
+    ap.add_argument("--fights", type=int, default=100000)
+    ap.add_argument("--max-turns", type=int, default=300)
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    with open(args.player or os.path.join(game_root(root), "player_stats.json"), "r") as f: player = json.load(f)
+    depth = player['depth'] if args.depth is None else args.depth
+    corruption = player['corruption'] if args.corruption is None else args.corruption
+    mob = resolve_mob(args.mob, depth, corruption, args.rarity, args.seed)
+
+    report = {}
+    for spec in args.policy or ["boss", "MOV"]:
+        start = time.time()
+        r = estimate(player, mob, spec, args.fights, args.max_turns, args.seed)
+        r['elapsed'] = time.time() - start; report[spec] = r
+        if args.json: continue
+        t = r['turns_to_kill']
+        kill = f"{t['mean']:.1f} turns (p10 {t['p10']:.0f} / p50 {t['p50']:.0f} / p90 {t['p90']:.0f})" if t['mean'] is not None else "-"
+        print(f"[{spec}] win {r['win'] * 100:.2f}% | loss {r['loss'] * 100:.2f}% | kill {kill} | "
+              f"HP loss {r['hp_loss']['mean']:.0f} | keys {r['keys_used']:.1f} | {r['fights']} fights in {r['elapsed']:.2f}s")
+    if args.json: print(json.dumps({"mob": mob, "report": report}, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine import DelveEngine, FSYNC_MODES
+
+def bench(mode, state, base, writes, room_every):
+    # Per-action player saves with a sector change (checkpoint) every room_every writes
+    with tempfile.TemporaryDirectory(dir=base) as root:
+        engine = DelveEngine(verbose=False, root=root, world="memory", state=state, durability=mode)
+        engine.reset_run("bench")
+        start = time.perf_counter()
+        for i in range(writes):
+            engine.player['hp'] += 1 if i % 2 else -1
+            engine.save_player(engine.player, checkpoint=(i % room_every == 0))
+        elapsed = time.perf_counter() - start
+    return {"mode": mode, "state": state, "writes": writes, "per_sec": writes / elapsed, "us_per_write": elapsed / writes * 1e6}
+
+def main():
+    ap = argparse.ArgumentParser(description="Cost of each state durability mode")
+    ap.add_argument("--dir", default=tempfile.gettempdir(), help="Filesystem to measure (e.g. /dev/shm vs a real disk)")
+    ap.add_argument("--writes", type=int, default=2000)
+    ap.add_argument("--room-every", type=int, default=10, help="Writes per sector change (checkpoint)")
+    args = ap.parse_args()
+    print(f">> {args.writes} player saves on {args.dir}, checkpoint every {args.room_every}")
+    for state in ("json", "journal"):
+        for mode in FSYNC_MODES:
+            r = bench(mode, state, args.dir, args.writes, args.room_every)
+            print(f"{state:8} {mode:11} {r['per_sec']:10.0f} writes/s {r['us_per_write']:9.1f} us/write")
+
+if __name__ == "__main__":
+    main()
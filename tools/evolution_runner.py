@@ -1,10 +1,17 @@
 import os
+import sys
 import subprocess
 import json
 import time
 
-GAME_DIR = "/home/dad/gemini/game-room/labyrinth"
-ENGINE = os.path.join(GAME_DIR, "engine.py")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE = os.path.join(REPO_DIR, "engine.py")
+AGENT = os.path.join(REPO_DIR, "agents", "sysadmin_ascender.py")
+sys.path.insert(0, REPO_DIR)
+from engine import game_root, pop_flag
+
+# Game root: --root <dir> or LABYRINTH_ROOT, defaulting to the repo checkout
+GAME_DIR = game_root(pop_flag(sys.argv[1:], "--root")[0])
 GLOBAL_FILE = os.path.join(GAME_DIR, "global_stats.json")
 LOG_FILE = "evolution_log.txt"
 
@@ -14,19 +21,14 @@ def get_global_xp():
 
 def run_ascender():
     print(">> Starting run with sysadmin_ascender.py...")
-    result = subprocess.run(["python3", "sysadmin_ascender.py"], capture_output=True, text=True, cwd=GAME_DIR)
-    
-    depth = 0
-    conquered = False
-    for line in result.stdout.splitlines():
-        if "[DEPTH" in line:
-            try:
-                depth = int(line.split("[DEPTH ")[1].split("]")[0])
-            except: pass
-        if "CONQUERED" in line:
-            conquered = True
-    
-    return depth, conquered
+    result = subprocess.run(["python3", AGENT, "--root", GAME_DIR, "--json"], capture_output=True, text=True, cwd=GAME_DIR)
+    # The last stdout line is the runtime's JSON result; anything else means the agent crashed
+    lines = result.stdout.strip().splitlines()
+    try: res = json.loads(lines[-1])
+    except (IndexError, ValueError):
+        print(f">> Agent produced no result (exit {result.returncode}): {result.stderr.strip()[-300:]}")
+        return 0, False
+    return res['depth'], res['conquered']
 
 def buy_upgrades():
     xp = get_global_xp()
@@ -37,7 +39,8 @@ def buy_upgrades():
         elif upgrades % 5 < 4: stat = "atk"
         else: stat = "dodge"
             
-        subprocess.run(["python3", ENGINE, "--upgrade", stat], capture_output=True, cwd=GAME_DIR)
+        out = subprocess.run(["python3", ENGINE, "--root", GAME_DIR, "--upgrade", stat, "--json"], capture_output=True, text=True, cwd=GAME_DIR)
+        if not json.loads(out.stdout)['ok']: break
         xp -= 200
         upgrades += 1
     print(f">> Purchased {upgrades} upgrades.")
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+from engine import DelveEngine, FileWorld, MemoryWorld, ROOM_CACHE
+from runtime import AgentRuntime, POLICIES, load_policy
+
+DEFAULT_GLOBALS = {"total_xp": 0, "base_hp": 50, "base_atk": 5, "base_crit": 10, "base_dodge": 15, "base_seed": "GEMINI_V1"}
+
+class Descent:
+    # One full descent of an agents/runtime.py Policy, a step at a time: iterating yields the runtime's
+    # (argv, fight policy) commands and execute() runs one. simulate() just runs them all; the orchestrator
+    # offloads or interleaves them. With root set it plays on real directories and state files there;
+    # otherwise nothing touches the disk.
+    def __init__(self, policy, seed, globals=None, world=None, root=None, max_actions=20000):
+        self.seed = seed; self.max_actions = max_actions
+        self.g = dict(globals or DEFAULT_GLOBALS); self.xp_before = self.g['total_xp']; self.actions = 0
+        # Every roll comes from the run's seeded streams, so seed + policy fully determines the descent
+        if root: self.engine = DelveEngine(verbose=False, root=root, globals=self.g)
+        else: self.engine = DelveEngine(verbose=False, world=world or MemoryWorld(), persist=False, globals=self.g)
+        self.runtime = AgentRuntime(policy, engine=self.engine, verbose=False)
+        self.engine.reset_run(seed); self.engine.generate_room("start")
+
+    def __iter__(self):
+        for cmd in self.runtime.steps():
+            if self.actions >= self.max_actions: break
+            yield cmd
+            self.actions += 1
+        if self.runtime.player(): self.engine.terminate() # Bank the XP like a dying agent would
+
+    def execute(self, cmd):
+        argv, fight = cmd
+        return self.engine.execute(argv, policy=fight)
+
+    def result(self):
+        return {"seed": self.seed, "depth": self.runtime.depth, "conquered": self.runtime.outcome == "conquered",
+                "xp_banked": self.g['total_xp'] - self.xp_before, "actions": self.actions}
+
+def simulate(policy, seed, globals=None, world=None, root=None, max_actions=20000):
+    run = Descent(policy, seed, globals, world, root, max_actions)
+    for cmd in run: run.execute(cmd)
+    return run.result()
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless in-memory descents")
+    ap.add_argument("--runs", type=int, default=1000)
+    ap.add_argument("--seed", default="sim", help="Run i uses seed '<seed>-<i>'")
+    ap.add_argument("--policy", choices=list(POLICIES), default="sysadmin", help="agents/runtime.py strategy")
+    ap.add_argument("--globals", help="global_stats.json to take base stats from")
+    ap.add_argument("--check-file", action="store_true", help="Replay the first run on real directories and compare")
+    ap.add_argument("--json", action="store_true", help="Print one JSON result per run")
+    args = ap.parse_args()
+
+    g = DEFAULT_GLOBALS
+    if args.globals:
+        with open(args.globals, "r") as f: g = json.load(f)
+
+    start = time.time(); results = []
+    for i in range(args.runs):
+        r = simulate(load_policy(args.policy), f"{args.seed}-{i}", g)
+        results.append(r)
+        if args.json: print(json.dumps(r))
+    elapsed = time.time() - start
+
+    depths = [r['depth'] for r in results]
+    print(f">> {args.runs} descents in {elapsed:.2f}s ({args.runs / elapsed * 60:.0f}/min)")
+    print(f">> Mean depth {sum(depths) / len(depths):.1f} | Max depth {max(depths)} | Conquered {sum(r['conquered'] for r in results)}")
+    # Distinct seeds never share a sector, so a fresh batch can't hit the room cache
+    cache = ROOM_CACHE.stats()
+    print(f">> Room cache {cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate'] * 100:.1f}%)")
+
+    if args.check_file:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "start"))
+            on_disk = simulate(load_policy(args.policy), f"{args.seed}-0", g, world=FileWorld(tmp))
+        same = on_disk == results[0]
+        print(f">> File-mode check: {'MATCH' if same else 'MISMATCH'} {on_disk}")
+        # The replay only hits while run 0's sectors are still in the LRU, i.e. for small batches
+        after = ROOM_CACHE.stats()
+        print(f">> Replay cache {after['hits'] - cache['hits']} hits / {after['misses'] - cache['misses']} misses")
+        if not same: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TOOLS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(TOOLS_DIR), "agents"))
+from headless_sim import DEFAULT_GLOBALS, Descent, simulate
+from runtime import POLICIES, load_policy
+
+def run_job(job):
+    # Whole session in a worker process (executor "process"): no engine state crosses the process boundary
+    with tempfile.TemporaryDirectory(prefix="labyrinth_") if job['mode'] == "tempdir" else nullcontext() as root:
+        if root: os.makedirs(os.path.join(root, "start"))
+        return dict(simulate(load_policy(job['policy']), job['seed'], job['globals'], root=root, max_actions=job['max_actions']),
+                    policy=job['policy'])
+
+async def session(job, sem, pool, executor, yield_every):
+    # One agent session as a coroutine. Each engine call is a short CPU burst: "inline" runs it on the loop and
+    # yields every few actions, "thread" offloads each call (useful for file roots), "process" ships the session.
+    loop = asyncio.get_running_loop()
+    async with sem:
+        if executor == "process": return await loop.run_in_executor(pool, run_job, job)
+        tmp = tempfile.TemporaryDirectory(prefix="labyrinth_") if job['mode'] == "tempdir" else None
+        try:
+            if tmp: os.makedirs(os.path.join(tmp.name, "start"))
+            run = Descent(load_policy(job['policy']), job['seed'], job['globals'], root=tmp and tmp.name, max_actions=job['max_actions'])
+            for cmd in run:
+                if executor == "thread": await loop.run_in_executor(pool, run.execute, cmd)
+                else:
+                    run.execute(cmd)
+                    if run.actions % yield_every == 0: await asyncio.sleep(0)
+            return dict(run.result(), policy=job['policy'])
+        finally:
+            if tmp: tmp.cleanup()
+
+async def orchestrate(jobs, concurrency=256, executor="inline", workers=None, yield_every=8):
+    sem = asyncio.Semaphore(concurrency)
+    pool = None
+    if executor == "thread": pool = ThreadPoolExecutor(workers or 32)
+    elif executor == "process": pool = ProcessPoolExecutor(workers or os.cpu_count())
+    try: return await asyncio.gather(*(session(job, sem, pool, executor, yield_every) for job in jobs))
+    finally:
+        if pool: pool.shutdown()
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many agent sessions concurrently in one asyncio event loop")
+    ap.add_argument("--sessions", type=int, default=500, help="Sessions per policy")
+    ap.add_argument("--policy", action="append", choices=list(POLICIES), help="agents/runtime.py strategy; repeatable, default: sysadmin")
+    ap.add_argument("--seed", default="orch")
+    ap.add_argument("--concurrency", type=int, default=256, help="Sessions in flight at once")
+    ap.add_argument("--executor", choices=["inline", "thread", "process"], default="inline")
+    ap.add_argument("--workers", type=int, help="Thread/process pool size")
+    ap.add_argument("--mode", choices=["memory", "tempdir"], default="memory")
+    ap.add_argument("--max-actions", type=int, default=20000)
+    args = ap.parse_args()
+
+    policies = args.policy or ["sysadmin"]
+    jobs = [{"seed": f"{args.seed}-{i}", "policy": pol, "mode": args.mode, "globals": DEFAULT_GLOBALS, "max_actions": args.max_actions}
+            for pol in policies for i in range(args.sessions)]
+    start = time.time()
+    results = asyncio.run(orchestrate(jobs, args.concurrency, args.executor, args.workers))
+    elapsed = time.time() - start
+
+    actions = sum(r['actions'] for r in results)
+    print(f">> {len(jobs)} sessions ({args.executor}, {args.mode}, {args.concurrency} in flight) in {elapsed:.2f}s | {actions / elapsed:.0f} actions/s")
+    for pol in policies:
+        rs = [r for r in results if r['policy'] == pol]
+        print(f"[{pol}] mean depth {sum(r['depth'] for r in rs) / len(rs):.1f} | max {max(r['depth'] for r in rs)} | "
+              f"conquered {sum(r['conquered'] for r in rs)} | mean XP {sum(r['xp_banked'] for r in rs) / len(rs):.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from engine import DelveEngine, MemoryWorld, room_name
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE rooms (id INTEGER PRIMARY KEY, path TEXT, depth INTEGER, door_type TEXT, parent INTEGER, via TEXT, info TEXT,
+                    UNIQUE (path, depth, door_type));
+CREATE TABLE doors (room INTEGER, door TEXT, leads_to TEXT, locked INTEGER, child INTEGER, PRIMARY KEY (room, door));
+CREATE TABLE mobs (room INTEGER, file TEXT, name TEXT, hp INTEGER, atk INTEGER, xp INTEGER, data TEXT, PRIMARY KEY (room, file));
+CREATE TABLE items (room INTEGER, file TEXT, name TEXT, type TEXT, data TEXT, PRIMARY KEY (room, file));
+CREATE INDEX rooms_depth ON rooms (depth);
+"""
+
+def pregen(seed, depth, out, max_rooms=200000, lvl=1, cls="Novice", corruption=0):
+    # Breadth-first walk of the room graph for one seed, first-visit contents (no backtrack, no leaks).
+    # Mob stats are scaled for the given corruption; lvl/class only change the info text.
+    # Sector names are 24-bit md5 prefixes, so different routes collide on a name, often at another depth or
+    # door type. A node is therefore (path, depth, door_type): the contents and children are a pure function of
+    # it, so a route reaching an existing node just links to it instead of expanding it again.
+    eng = DelveEngine(verbose=False, world=MemoryWorld(), persist=False, globals={})
+    tmp = out + ".tmp"
+    if os.path.exists(tmp): os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript(SCHEMA)
+        rooms, doors, mobs, items = [], [], [], []
+        ids = {("start", 0, "ROOT"): 1}; truncated = False
+        queue = deque([(1, "start", 0, "ROOT", None, None)])
+        while queue:
+            node, path, d, door_type, parent, via = queue.popleft()
+            spec = eng.build_room(path, {"seed": seed, "door_type": door_type, "backtrack": False, "depth": d,
+                                         "lvl": lvl, "class": cls, "corruption": corruption, "leaks": 0})
+            rooms.append((node, path, d, door_type, parent, via, spec['info']))
+            for f_n, m in spec['mobs'].items(): mobs.append((node, f_n, m['name'], m['hp'], m['atk'], m['xp'], json.dumps(m)))
+            for f_n, it in spec['items'].items(): items.append((node, f_n, it['name'], it['type'], json.dumps(it)))
+            for f_n, door in spec['doors'].items():
+                child = None
+                if d < depth:
+                    key = (room_name(path, f_n), d + 1, door['leads_to']); child = ids.get(key)
+                    if child is None and len(ids) >= max_rooms: truncated = True
+                    elif child is None:
+                        child = ids[key] = len(ids) + 1
+                        queue.append((child, *key, node, f_n))
+                doors.append((node, f_n, door['leads_to'], int(door['locked']), child))
+        with db:
+            db.executemany("INSERT INTO rooms VALUES (?, ?, ?, ?, ?, ?, ?)", rooms)
+            db.executemany("INSERT INTO doors VALUES (?, ?, ?, ?, ?)", doors)
+            db.executemany("INSERT INTO mobs VALUES (?, ?, ?, ?, ?, ?, ?)", mobs)
+            db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)", items)
+            meta = {"seed": seed, "depth": depth, "rooms": len(rooms), "truncated": truncated,
+                    "lvl": lvl, "class": cls, "corruption": corruption}
+            db.executemany("INSERT INTO meta VALUES (?, ?)", [(k, json.dumps(v)) for k, v in meta.items()])
+    except BaseException:
+        db.close(); os.remove(tmp) # Never leave a half-written map behind
+        raise
+    db.close(); os.replace(tmp, out)
+    return meta
+
+class MapIndex:
+    # Read side for agents and planners: indexed lookups instead of listing doors/ one sector at a time.
+    # Sectors are nodes with an integer id; room() finds one from what the engine knows (path, depth, door type).
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.meta = {k: json.loads(v) for k, v in self.db.execute("SELECT key, value FROM meta")}
+
+    def room(self, path, depth=None, door_type=None):
+        # Shallowest node named path, narrowed by depth / door type when given (the name alone can be ambiguous)
+        sql = "SELECT id FROM rooms WHERE path = ?"; args = [path]
+        if depth is not None: sql += " AND depth = ?"; args.append(depth)
+        if door_type is not None: sql += " AND door_type = ?"; args.append(door_type)
+        row = self.db.execute(sql + " ORDER BY id LIMIT 1", args).fetchone()
+        return self.node(row[0]) if row else None
+
+    def node(self, node):
+        row = self.db.execute("SELECT path, depth, door_type, parent, via, info FROM rooms WHERE id = ?", (node,)).fetchone()
+        if not row: return None
+        return {"id": node, "path": row[0], "depth": row[1], "door_type": row[2], "parent": row[3], "via": row[4], "info": row[5],
+                "doors": self.doors(node), "mobs": self.contents(node, "mobs"), "items": self.contents(node, "items")}
+
+    def doors(self, node):
+        rows = self.db.execute("SELECT door, leads_to, locked, child FROM doors WHERE room = ? ORDER BY door", (node,))
+        return {r[0]: {"leads_to": r[1], "locked": bool(r[2]), "child": r[3]} for r in rows}
+
+    def contents(self, node, kind):
+        rows = self.db.execute(f"SELECT file, data FROM {kind} WHERE room = ? ORDER BY file", (node,))
+        return {r[0]: json.loads(r[1]) for r in rows}
+
+    def route(self, node):
+        # Door files to take from start to reach node (along the route that first discovered it)
+        route = []
+        while node and node != 1:
+            node, via = self.db.execute("SELECT parent, via FROM rooms WHERE id = ?", (node,)).fetchone()
+            route.append(via)
+        return route[::-1]
+
+def main():
+    ap = argparse.ArgumentParser(description="Pre-generate a seed's room graph into a SQLite map")
+    ap.add_argument("--pregen", metavar="SEED", required=True, help="Run seed (as in --init --seed)")
+    ap.add_argument("--depth", type=int, default=10, help="Levels below start to expand")
+    ap.add_argument("--out", help="SQLite file (default: map_<seed>.db)")
+    ap.add_argument("--max-rooms", type=int, default=200000, help="Stop expanding after this many sectors")
+    ap.add_argument("--corruption", type=int, default=0, help="Corruption the mob stats are scaled for")
+    args = ap.parse_args()
+
+    out = args.out or f"map_{args.pregen}.db"
+    start = time.time()
+    meta = pregen(args.pregen, args.depth, out, args.max_rooms, corruption=args.corruption)
+    print(f">> {meta['rooms']} sectors to depth {args.depth} in {time.time() - start:.2f}s -> {out}" + (" (truncated by --max-rooms)" if meta['truncated'] else ""))
+
+if __name__ == "__main__":
+    main()
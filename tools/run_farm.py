@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from headless_sim import DEFAULT_GLOBALS, simulate
+from runtime import POLICIES, load_policy
+from engine import DelveEngine, MemoryWorld
+
+UPGRADE_COST = 200
+
+def buy_upgrades(globals, schedule, bought):
+    # Same spending loop as evolution_runner.buy_upgrades, but the stat order comes from the schedule
+    eng = DelveEngine(verbose=False, world=MemoryWorld(), persist=False, globals=globals)
+    while globals['total_xp'] >= UPGRADE_COST:
+        eng.upgrade(schedule[bought % len(schedule)]); bought += 1
+    return bought
+
+def run_campaign(job):
+    # One evolution campaign: descend, bank XP, buy upgrades, repeat until conquered or out of attempts
+    g = dict(DEFAULT_GLOBALS); bought = 0; attempts = []
+    tmp = tempfile.TemporaryDirectory(prefix="labyrinth_") if job['mode'] == "tempdir" else None
+    try:
+        for a in range(job['attempts']):
+            seed = f"{job['seed']}-{a}"
+            if tmp:
+                # Isolated game root per job: its own start/, room dirs and state files
+                os.makedirs(os.path.join(tmp.name, "start"), exist_ok=True)
+                r = simulate(load_policy(job['policy']), seed, g, root=tmp.name)
+            else:
+                r = simulate(load_policy(job['policy']), seed, g)
+            g['total_xp'] += r['xp_banked']; attempts.append(r)
+            if r['conquered']: break
+            bought = buy_upgrades(g, job['schedule'], bought)
+    finally:
+        if tmp: tmp.cleanup()
+    return {"schedule": ",".join(job['schedule']), "seed": job['seed'], "attempts": len(attempts),
+            "conquered": attempts[-1]['conquered'], "max_depth": max(r['depth'] for r in attempts),
+            "xp": sum(r['xp_banked'] for r in attempts), "upgrades": bought}
+
+def merge(results):
+    report = {}
+    for r in results:
+        s = report.setdefault(r['schedule'], {"campaigns": 0, "conquered": 0, "attempts_to_conquer": [], "max_depth": [], "xp": []})
+        s['campaigns'] += 1; s['max_depth'].append(r['max_depth']); s['xp'].append(r['xp'])
+        if r['conquered']: s['conquered'] += 1; s['attempts_to_conquer'].append(r['attempts'])
+    for s in report.values():
+        n = s['campaigns']; won = s.pop('attempts_to_conquer')
+        s['conquer_rate'] = s['conquered'] / n
+        s['mean_attempts_to_conquer'] = sum(won) / len(won) if won else None
+        depths = s.pop('max_depth'); xp = s.pop('xp')
+        s['mean_max_depth'] = sum(depths) / n; s['best_depth'] = max(depths)
+        s['mean_xp'] = sum(xp) / n
+    return report
+
+def main():
+    ap = argparse.ArgumentParser(description="Shard seeded evolution campaigns across a process pool")
+    ap.add_argument("--runs", type=int, default=64, help="Campaigns per schedule")
+    ap.add_argument("--attempts", type=int, default=200, help="Max descents per campaign (evolution_runner uses 200)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--mode", choices=["memory", "tempdir"], default="memory")
+    ap.add_argument("--seed", default="farm")
+    ap.add_argument("--policy", choices=list(POLICIES), default="sysadmin", help="agents/runtime.py strategy")
+    ap.add_argument("--schedule", action="append", help="Upgrade order, e.g. hp,hp,hp,atk,dodge (repeatable to sweep)")
+    ap.add_argument("--out", help="Write the merged report as JSON")
+    args = ap.parse_args()
+
+    schedules = [s.split(",") for s in (args.schedule or ["hp,hp,hp,atk,dodge"])]
+    jobs = [{"schedule": sch, "seed": f"{args.seed}-{i}", "mode": args.mode, "attempts": args.attempts, "policy": args.policy}
+            for sch in schedules for i in range(args.runs)]
+
+    start = time.time()
+    with Pool(args.workers) as pool:
+        results = list(pool.imap_unordered(run_campaign, jobs))
+    elapsed = time.time() - start
+
+    report = merge(results)
+    print(f">> {len(jobs)} campaigns on {args.workers} workers ({args.mode}) in {elapsed:.1f}s")
+    for sch, s in report.items():
+        mean_att = f"{s['mean_attempts_to_conquer']:.1f}" if s['mean_attempts_to_conquer'] is not None else "-"
+        print(f"[{sch}] conquered {s['conquered']}/{s['campaigns']} | attempts to conquer {mean_att} | "
+              f"mean max depth {s['mean_max_depth']:.1f} (best {s['best_depth']}) | mean XP {s['mean_xp']:.0f}")
+    if args.out:
+        with open(args.out, "w") as f: json.dump({"elapsed": elapsed, "jobs": len(jobs), "report": report, "runs": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,20 @@
 import os
-import subprocess
+import sys
 import json
-import time
 
-GAME_DIR = "/home/dad/gemini/game-room/labyrinth"
-ENGINE = os.path.join(GAME_DIR, "engine.py")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+from engine import DelveEngine, game_root, pop_flag
+
+# Game root: --root <dir> or LABYRINTH_ROOT, defaulting to the repo checkout
+GAME_DIR = game_root(pop_flag(sys.argv[1:], "--root")[0])
 PLAYER_FILE = os.path.join(GAME_DIR, "player_stats.json")
 COMBAT_FILE = os.path.join(GAME_DIR, "combat_state.json")
 
-def reset_player():
+def reset_player(trial_num):
+    # Own seed per trial: combat rolls come from the run's seeded streams, so a shared seed would replay one fight
     stats = {
+        "seed": f"trial-{trial_num}", "rng": {},
         "hp": 683, "max_hp": 1605, "atk": 209, "crit": 32, "dodge": 35, "dr": 17,
         "percent_dmg": 0, "xp": 2665, "lvl": 11, "xp_to_lvl": 11524,
         "shield_turns": 0, "room_path": "room_2476c9", "depth": 100,
@@ -21,58 +26,33 @@ def reset_player():
     with open(PLAYER_FILE, "w") as f:
         json.dump(stats, f, indent=4)
 
-def get_combat_state():
-    if os.path.exists(COMBAT_FILE):
-        with open(COMBAT_FILE, "r") as f:
-            return json.load(f)
-    return None
-
-def run_cmd(args):
-    return subprocess.run(["python3", ENGINE] + args, capture_output=True, text=True, cwd=GAME_DIR)
+def boss_policy(p, c, turn):
+    # Purge once the boss is under 25%, otherwise keep LOCK active
+    if c['mob_hp'] < (c['mob_max_hp'] * 0.25): return "PURGE"
+    return "LOCK" if c.get('lock_turns', 0) <= 1 else "MOV"
 
 def run_trial(trial_num):
     print(f"--- Trial {trial_num} ---")
-    reset_player()
+    reset_player(trial_num)
     if os.path.exists(COMBAT_FILE):
         os.remove(COMBAT_FILE)
-    
-    # Init combat
-    run_cmd(["--attack", "BOSS_[BOSS]_Key_Devourer.json"])
-    
-    turn = 1
-    while True:
-        c = get_combat_state()
-        if not c:
-            print(f"Trial {trial_num} failed: Combat ended (Player likely died).")
-            return False
-        
-        # Check if we can purge
-        if c['mob_hp'] < (c['mob_max_hp'] * 0.25):
-            print(f"Boss HP at {c['mob_hp']}/{c['mob_max_hp']}. Attempting PURGE!")
-            res = run_cmd(["--purge-cmd"])
-            print(res.stdout)
-            if "CONQUERED" in res.stdout:
-                return True
-            return False
 
-        # Strategy: Keep LOCK active
-        if c.get('lock_turns', 0) <= 1:
-            res = run_cmd(["--op", "LOCK"])
-        else:
-            res = run_cmd(["--op", "MOV"])
-        
-        # Print all lines of output
-        for line in res.stdout.splitlines():
-            if line.strip():
-                print(f"T{turn}: {line}")
-        
-        if "RUN TERMINATED" in res.stdout:
-            print(f"Trial {trial_num} failed: Player died.")
-            return False
-        
-        turn += 1
-        if turn > 50: # Failsafe
-            return False
+    # Whole fight in one in-process call; state is written once at the end
+    engine = DelveEngine(verbose=False, root=GAME_DIR)
+    # The boss sector is rebuilt for this trial's seed: the previous trial's win or death wiped it
+    engine.generate_room(engine.player['room_path'])
+    res = engine.resolve_combat(boss_policy, "BOSS_[BOSS]_Key_Devourer.json", max_turns=50)
+    if not res['ok']:
+        print(f"Trial {trial_num} failed: {res['error']}")
+        return False
+    for t in res['turns']:
+        print(f"T{t['turn'] + 1}: {t['opcode']} dealt {t['dmg_dealt']} took {t['dmg_taken']} | boss {t.get('mob_hp', 0)} | hp {t.get('hp', '-')}")
+
+    if res['outcome'] == "conquered":
+        return True
+    if res['outcome'] == "terminated":
+        print(f"Trial {trial_num} failed: Player died.")
+    return False
 
 results = []
 for i in range(1, 11):
@@ -80,7 +60,6 @@ for i in range(1, 11):
     results.append(success)
     if success:
         print(f"SUCCESS ON TRIAL {i}!")
-    time.sleep(0.5)
 
 print("\n=== FINAL RESULTS ===")
 print(f"Successes: {sum(results)}/10")